@@ -1,150 +1,308 @@
 # ast_nodes.py - DLBA AST nodes (v0.8)
-class Number:
-    def __init__(self, value):
-        self.value = value
-        self.lineno = None
-        self.filename = None
-        self.col = None
+import marshal
+import threading
+import weakref
+
+# a node's source position is one int: file id | column << 24 | line << 48,
+# each part stored +1 so that 0 means unknown (None). File ids index
+# _filenames and are only valid in the current process.
+_FILE_BITS = 24
+_COL_MASK = (1 << 24) - 1
+_LINE_SHIFT = 48
+_filenames = [None]
+_file_ids = {None: 0}
+# (lineno, filename, col) -> packed position, for Node.__setstate__
+_loaded_pos = {}
+_file_ids_lock = threading.Lock()
+
+
+def file_id(filename):
+    fid = _file_ids.get(filename)
+    if fid is None:
+        # interpreters may parse on several threads: allocate under the lock,
+        # and publish the id only once _filenames has its entry
+        with _file_ids_lock:
+            fid = _file_ids.get(filename)
+            if fid is None:
+                _filenames.append(filename)
+                fid = _file_ids[filename] = len(_filenames) - 1
+    return fid
+
+
+def pack_pos(lineno, filename, col=None):
+    return (
+        file_id(filename)
+        | (0 if col is None else min(col + 1, _COL_MASK)) << _FILE_BITS
+        | (0 if lineno is None else lineno + 1) << _LINE_SHIFT
+    )
+
+
+class Node:
+    # base of all nodes: no per-instance __dict__, fields listed in _fields
+    # (__slots__), position in _pos behind lineno / filename / col
+    __slots__ = ("_pos",)
+    _fields = ()
+
+    def set_pos(self, lineno, filename, col=None):
+        # pack_pos, inlined: the parser calls this for most nodes
+        fid = _file_ids.get(filename)
+        if fid is None:
+            fid = file_id(filename)
+        if col is None:
+            col = 0
+        elif col < _COL_MASK:
+            col += 1
+        else:
+            col = _COL_MASK
+        self._pos = fid | col << _FILE_BITS | (0 if lineno is None else lineno + 1) << _LINE_SHIFT
+
+    @property
+    def lineno(self):
+        line = self._pos >> _LINE_SHIFT
+        return line - 1 if line else None
+
+    @lineno.setter
+    def lineno(self, value):
+        self.set_pos(value, self.filename, self.col)
+
+    @property
+    def filename(self):
+        return _filenames[self._pos & ((1 << _FILE_BITS) - 1)]
+
+    @filename.setter
+    def filename(self, value):
+        self.set_pos(self.lineno, value, self.col)
+
+    @property
+    def col(self):
+        col = (self._pos >> _FILE_BITS) & _COL_MASK
+        return col - 1 if col else None
+
+    @col.setter
+    def col(self, value):
+        self.set_pos(self.lineno, self.filename, value)
+
+    def __getstate__(self):
+        # file ids differ between processes: pickle the position unpacked
+        return (self.lineno, self.filename, self.col), [getattr(self, f) for f in self._fields]
+
+    def __setstate__(self, state):
+        if isinstance(state, dict):
+            # pickled before nodes had __slots__ (old bundles and snapshots)
+            pos = (state.get("lineno"), state.get("filename"), state.get("col"))
+            values = [state.get(f) for f in self._fields]
+        else:
+            pos, values = state
+        # a parsed parent holds the very int of its child's position: loaded
+        # nodes reuse the one packed for a recent equal position as well
+        packed = _loaded_pos.get(pos)
+        if packed is None:
+            self.set_pos(*pos)
+            if len(_loaded_pos) >= 4096:
+                _loaded_pos.clear()
+            _loaded_pos[pos] = self._pos
+        else:
+            self._pos = packed
+        for name, value in zip(self._fields, values):
+            if value.__class__ is list:
+                # unpickled lists grow by appends: keep an exact-size copy
+                value = value[:]
+            setattr(self, name, value)
+
+
+# constant leaves that compare equal (same class, value type and value) are
+# stored once: see shared()
+_shared_leaves = weakref.WeakValueDictionary()
+
+
+def _load_shared(cls, value):
+    # unpickling a shared leaf: its position was never read, so none is kept
+    return shared(cls(value))
+
+
+def shared(node):
+    # the one instance of a constant leaf; other nodes are returned as they
+    # are. Parents copy a child's position before sharing it, and nothing
+    # reads the position of a leaf inside an expression afterwards.
+    if type(node) in _LEAF_TYPES:
+        key = (type(node), type(node.value), node.value)
+        leaf = _shared_leaves.get(key)
+        if leaf is None:
+            _shared_leaves[key] = leaf = node
+        return leaf
+    return node
 
-class String:
-    def __init__(self, value):
-        self.value = value
-        self.lineno = None
-        self.filename = None
-        self.col = None
 
-class Boolean:
+class _Leaf(Node):
+    # a constant leaf: Number, String or Boolean
+    _fields = ("value",)
+    __slots__ = ("value", "__weakref__")
+
     def __init__(self, value):
         self.value = value
-        self.lineno = None
-        self.filename = None
-        self.col = None
+        self._pos = 0
+
+    def __reduce_ex__(self, protocol):
+        # a shared leaf is loaded back through the same table, so trees that
+        # come from the parse cache, a bundle, a snapshot or a parser worker
+        # share their leaves as freshly parsed ones do
+        if _shared_leaves.get((type(self), type(self.value), self.value)) is self:
+            return _load_shared, (type(self), self.value)
+        return super().__reduce_ex__(protocol)
+
+class Number(_Leaf):
+    __slots__ = ()
+
+class String(_Leaf):
+    __slots__ = ()
+
+class Boolean(_Leaf):
+    __slots__ = ()
+
+_LEAF_TYPES = (Number, String, Boolean)
+
+class BinOp(Node):
+    __slots__ = _fields = ("left", "op", "right")
 
-class BinOp:
     def __init__(self, left, op, right):
-        self.left = left
+        self._pos = left._pos
+        self.left = shared(left)
         self.op = op
-        self.right = right
-        self.lineno = getattr(left, 'lineno', None)
-        self.filename = getattr(left, 'filename', None)
-        self.col = getattr(left, 'col', None)
+        self.right = shared(right)
+
+class UnaryOp(Node):
+    __slots__ = _fields = ("op", "operand")
 
-class UnaryOp:
     def __init__(self, op, operand):
+        self._pos = operand._pos
         self.op = op
-        self.operand = operand
-        self.lineno = getattr(operand, 'lineno', None)
-        self.filename = getattr(operand, 'filename', None)
-        self.col = getattr(operand, 'col', None)
+        self.operand = shared(operand)
+
+class Var(Node):
+    __slots__ = _fields = ("name",)
 
-class Var:
     def __init__(self, name):
         self.name = name
-        self.lineno = None
-        self.filename = None
-        self.col = None
+        self._pos = 0
+
+class Assign(Node):
+    __slots__ = _fields = ("name", "expr", "declare")
 
-class Assign:
     def __init__(self, name, expr, declare=False):
+        self._pos = expr._pos
         self.name = name
-        self.expr = expr
+        self.expr = shared(expr)
         self.declare = declare
-        self.lineno = getattr(expr, 'lineno', None)
-        self.filename = getattr(expr, 'filename', None)
-        self.col = getattr(expr, 'col', None)
 
-class Print:
+class Print(Node):
+    __slots__ = _fields = ("expr",)
+
     def __init__(self, expr):
-        self.expr = expr
-        self.lineno = getattr(expr, 'lineno', None)
-        self.filename = getattr(expr, 'filename', None)
-        self.col = getattr(expr, 'col', None)
+        self._pos = expr._pos
+        self.expr = shared(expr)
+
+class If(Node):
+    __slots__ = _fields = ("condition", "then_branch", "elif_branches", "else_branch")
 
-class If:
     def __init__(self, condition, then_branch, elif_branches=None, else_branch=None):
-        self.condition = condition
+        self._pos = condition._pos
+        self.condition = shared(condition)
         self.then_branch = then_branch
-        self.elif_branches = elif_branches or []
+        self.elif_branches = [(shared(c), b) for c, b in elif_branches or ()]
         self.else_branch = else_branch
-        self.lineno = getattr(condition, 'lineno', None)
-        self.filename = getattr(condition, 'filename', None)
-        self.col = getattr(condition, 'col', None)
 
-class While:
+class While(Node):
+    __slots__ = _fields = ("condition", "body")
+
     def __init__(self, condition, body):
-        self.condition = condition
+        self._pos = condition._pos
+        self.condition = shared(condition)
         self.body = body
-        self.lineno = getattr(condition, 'lineno', None)
-        self.filename = getattr(condition, 'filename', None)
-        self.col = getattr(condition, 'col', None)
 
-class FunctionDef:
+class FunctionDef(Node):
+    __slots__ = _fields = ("name", "params", "body")
+
     def __init__(self, name, params, body):
         self.name = name
         self.params = params
         self.body = body
-        self.lineno = None
-        self.filename = None
-        self.col = None
+        self._pos = 0
+
+class Return(Node):
+    __slots__ = _fields = ("expr",)
 
-class Return:
     def __init__(self, expr):
-        self.expr = expr
-        self.lineno = getattr(expr, 'lineno', None) if expr is not None else None
-        self.filename = getattr(expr, 'filename', None) if expr is not None else None
-        self.col = getattr(expr, 'col', None) if expr is not None else None
+        self._pos = expr._pos if expr is not None else 0
+        self.expr = shared(expr)
+
+class Call(Node):
+    __slots__ = _fields = ("callee", "args")
 
-class Call:
     def __init__(self, callee, args):
+        self._pos = callee._pos
         self.callee = callee
-        self.args = args
-        self.lineno = getattr(callee, 'lineno', None)
-        self.filename = getattr(callee, 'filename', None)
-        self.col = getattr(callee, 'col', None)
+        self.args = [shared(a) for a in args]
+
+class Import(Node):
+    # resolved_path: set by the linker to the linked module's key
+    __slots__ = _fields = ("path", "as_name", "names", "resolved_path")
 
-class Import:
     def __init__(self, path, as_name=None, names=None):
         self.path = path
         self.as_name = as_name
         self.names = names
-        self.lineno = None
-        self.filename = None
-        self.col = None
+        self.resolved_path = None
+        self._pos = 0
+
+class ModuleAccess(Node):
+    __slots__ = _fields = ("obj", "member")
 
-class ModuleAccess:
     def __init__(self, obj, member):
+        self._pos = obj._pos
         self.obj = obj
         self.member = member
-        self.lineno = getattr(obj, 'lineno', None)
-        self.filename = getattr(obj, 'filename', None)
-        self.col = getattr(obj, 'col', None)
 
-class ListLiteral:
+class ListLiteral(Node):
+    __slots__ = _fields = ("elements",)
+
     def __init__(self, elements):
-        self.elements = elements
-        self.lineno = getattr(elements[0], 'lineno', None) if elements else None
-        self.filename = getattr(elements[0], 'filename', None) if elements else None
-        self.col = getattr(elements[0], 'col', None) if elements else None
+        self._pos = elements[0]._pos if elements else 0
+        self.elements = [shared(e) for e in elements]
+
+class DictLiteral(Node):
+    __slots__ = _fields = ("pairs",)
 
-class DictLiteral:
     def __init__(self, pairs):
-        self.pairs = pairs  # list of (key_node, value_node)
-        self.lineno = getattr(pairs[0][0], 'lineno', None) if pairs else None
-        self.filename = getattr(pairs[0][0], 'filename', None) if pairs else None
-        self.col = getattr(pairs[0][0], 'col', None) if pairs else None
+        self._pos = pairs[0][0]._pos if pairs else 0
+        self.pairs = [(shared(k), shared(v)) for k, v in pairs]  # (key_node, value_node)
+
+class Constant(Node):
+    # a list/dict literal made only of numbers, strings, booleans and nested
+    # constant literals (see Parser._constant_literal). The value is kept
+    # marshalled: every evaluation unpacks a fresh copy in one C call
+    __slots__ = _fields = ("data",)
+
+    def __init__(self, value):
+        self.data = marshal.dumps(value)
+        self._pos = 0
+
+    @property
+    def value(self):
+        return marshal.loads(self.data)
+
+class Index(Node):
+    __slots__ = _fields = ("target", "index_expr")
 
-class Index:
     def __init__(self, target, index_expr):
-        self.target = target
-        self.index_expr = index_expr  # could be Number/Var or Slice node
-        self.lineno = getattr(target, 'lineno', None)
-        self.filename = getattr(target, 'filename', None)
-        self.col = getattr(target, 'col', None)
+        self._pos = target._pos
+        self.target = shared(target)
+        self.index_expr = shared(index_expr)  # could be Number/Var or Slice node
+
+class Slice(Node):
+    __slots__ = _fields = ("start", "stop")
 
-class Slice:
     def __init__(self, start, stop):
-        self.start = start  # can be None
-        self.stop = stop    # can be None
-        self.lineno = getattr(start, 'lineno', None) if start else getattr(stop, 'lineno', None)
-        self.filename = getattr(start, 'filename', None) if start else getattr(stop, 'filename', None)
-        self.col = getattr(start, 'col', None) if start else getattr(stop, 'col', None)
+        first = start if start is not None else stop
+        self._pos = first._pos if first is not None else 0
+        self.start = shared(start)  # can be None
+        self.stop = shared(stop)    # can be None
@@ -0,0 +1,104 @@
+# batch.py - run many DLBA scripts on a pool of warm worker processes (v0.8)
+#
+#   python main.py --batch [-j N] [--json] a.dlba b.dlba ...
+#   python main.py --batch [-j N] [--json] script.dlba --argv-file sets.txt
+#
+# each line of an argv file is one argv set (shell-style quoting). Workers
+# import the interpreter once and share the on-disk parse cache. Like the
+# server, a worker keeps imported modules between its jobs: module globals
+# carry over from one job to the next one on the same worker, while `dlba`
+# is rebound to each job's.
+import argparse
+import io
+import json
+import os
+import shlex
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+
+DEFAULT_CACHE_DIR = os.path.expanduser("~/.dlba_cache")
+
+
+def _warm_worker(cache_dir):
+    # runs once per worker process: import and set up everything up front
+    import interpreter
+
+    interpreter.default_interpreter().parse_cache_dir = cache_dir
+
+
+def _run_job(script, argv, cwd):
+    import interpreter
+    from main import run_file
+
+    out = io.StringIO()
+    start = time.perf_counter()
+    os.chdir(cwd)
+    # every job sees fresh copies of modules edited since the previous job
+    interpreter.drop_stale_modules()
+    with redirect_stdout(out), redirect_stderr(out):
+        status = run_file(script, argv)
+    return status, out.getvalue(), time.perf_counter() - start
+
+
+def run_batch(jobs, workers=None, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Run (script, argv) jobs concurrently and return one result dict per job,
+    in job order: script, argv, status, output, seconds.
+    """
+    cwd = os.getcwd()
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_warm_worker, initargs=(cache_dir,)
+    ) as pool:
+        futures = [pool.submit(_run_job, script, argv, cwd) for script, argv in jobs]
+        results = []
+        for (script, argv), fut in zip(jobs, futures):
+            status, output, seconds = fut.result()
+            results.append(
+                {
+                    "script": script,
+                    "argv": argv,
+                    "status": status,
+                    "output": output,
+                    "seconds": seconds,
+                }
+            )
+    return results
+
+
+def main(argv):
+    ap = argparse.ArgumentParser(
+        prog="main.py --batch", description="Run many DLBA scripts concurrently."
+    )
+    ap.add_argument("scripts", nargs="+", help=".dlba files to run")
+    ap.add_argument("-j", "--jobs", type=int, help="worker processes (default: CPUs)")
+    ap.add_argument(
+        "--argv-file", help="run the single script once per line of this file"
+    )
+    ap.add_argument("--json", action="store_true", help="print results as JSON")
+    ap.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="parse cache dir")
+    args = ap.parse_args(argv)
+
+    if args.argv_file:
+        if len(args.scripts) != 1:
+            ap.error("--argv-file takes exactly one script")
+        with open(args.argv_file, "r", encoding="utf-8") as f:
+            jobs = [(args.scripts[0], shlex.split(line)) for line in f if line.strip()]
+    else:
+        jobs = [(script, []) for script in args.scripts]
+
+    start = time.perf_counter()
+    results = run_batch(jobs, workers=args.jobs, cache_dir=args.cache_dir)
+    wall = time.perf_counter() - start
+    failed = sum(1 for r in results if r["status"] != 0)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results:
+            label = " ".join([r["script"]] + r["argv"])
+            print(f"==> {label} (exit {r['status']}, {r['seconds']:.3f}s)")
+            sys.stdout.write(r["output"])
+        print(f"{len(results)} job(s), {failed} failed, {wall:.3f}s wall")
+    return 1 if failed else 0
@@ -0,0 +1,77 @@
+# bundle.py - single-file program bundles (v0.8)
+import argparse
+import json
+import os
+import pickle
+import zipfile
+
+from lexer import SOURCE_MAP, remember_source
+from linker import Linker
+
+# a bundle is a zip archive whose table of contents lives in index.json:
+#   {"version": 1, "entry": key,
+#    "modules": {key: {"filename": ..., "source": member, "ast": member}}}
+# "ast" members hold the pickled, import-resolved statements of each module
+BUNDLE_INDEX = "index.json"
+BUNDLE_VERSION = 1
+
+
+def build_bundle(entry_path, out_path, shake=False):
+    linker = Linker(entry_path, shake=shake)
+    artifact = linker.link()
+    toc = {"version": BUNDLE_VERSION, "entry": artifact["entry"], "modules": {}}
+    with zipfile.ZipFile(out_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for i, mod in enumerate(linker.modules.values()):
+            stem = f"{i}_{os.path.basename(mod.abs_path)}"
+            stmts = artifact["modules"][mod.key]
+            zf.write(mod.abs_path, "src/" + stem)
+            zf.writestr(
+                "ast/" + stem + ".pickle",
+                pickle.dumps(stmts, protocol=pickle.HIGHEST_PROTOCOL),
+            )
+            toc["modules"][mod.key] = {
+                "filename": mod.filename,
+                "source": "src/" + stem,
+                "ast": "ast/" + stem + ".pickle",
+            }
+        zf.writestr(BUNDLE_INDEX, json.dumps(toc, indent=2))
+    return toc
+
+
+def is_bundle(path):
+    return zipfile.is_zipfile(path)
+
+
+def load_bundle(path, source_map=None):
+    """
+    Open a bundle once and return (entry_key, modules) where modules maps
+    each key to its parsed statements. Sources are registered in source_map
+    (default: SOURCE_MAP) so tracebacks still show the offending line.
+    """
+    if source_map is None:
+        source_map = SOURCE_MAP
+    with zipfile.ZipFile(path) as zf:
+        toc = json.loads(zf.read(BUNDLE_INDEX))
+        if toc.get("version") != BUNDLE_VERSION:
+            raise Exception(f"Unsupported bundle version {toc.get('version')} in {path}")
+        modules = {}
+        for key, info in toc["modules"].items():
+            modules[key] = pickle.loads(zf.read(info["ast"]))
+            source = zf.read(info["source"]).decode("utf-8")
+            remember_source(source_map, info["filename"], source)
+    return toc["entry"], modules
+
+
+def main(argv):
+    ap = argparse.ArgumentParser(
+        prog="main.py bundle", description="Package a DLBA program into one file."
+    )
+    ap.add_argument("entry", help="entry .dlba file")
+    ap.add_argument("-o", "--output", help="output path (default: <entry>.dlbz)")
+    ap.add_argument(
+        "--shake", action="store_true", help="drop unreachable module bindings"
+    )
+    args = ap.parse_args(argv)
+    out = args.output or os.path.splitext(args.entry)[0] + ".dlbz"
+    toc = build_bundle(args.entry, out, shake=args.shake)
+    print(f"bundled {len(toc['modules'])} module(s) -> {out}")
@@ -0,0 +1,45 @@
+# client.py - thin client for the DLBA server (v0.8)
+#
+#   python client.py script.dlba [args...]
+#
+# sends the script to a warm `python main.py --serve` process and forwards
+# its stdout/stderr and exit status; falls back to running main.py directly
+# when no server is listening. Only stdlib modules are imported here so the
+# client starts as fast as Python itself.
+import json
+import os
+import socket
+import sys
+
+DEFAULT_SOCKET = os.environ.get("DLBA_SOCKET") or os.path.expanduser("~/.dlba.sock")
+
+
+def run_remote(script, argv, sock_path=DEFAULT_SOCKET):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(sock_path)
+    request = {"script": script, "argv": argv, "cwd": os.getcwd()}
+    sock.sendall((json.dumps(request) + "\n").encode("utf-8"))
+    status = 1
+    with sock.makefile("r", encoding="utf-8") as f:
+        for line in f:
+            msg = json.loads(line)
+            if "out" in msg:
+                sys.stdout.write(msg["out"])
+            elif "err" in msg:
+                sys.stderr.write(msg["err"])
+            elif "exit" in msg:
+                status = msg["exit"]
+    sock.close()
+    sys.stdout.flush()
+    return status
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python client.py script.dlba [args...]")
+        sys.exit(2)
+    try:
+        sys.exit(run_remote(sys.argv[1], sys.argv[2:]))
+    except (FileNotFoundError, ConnectionRefusedError):
+        main_py = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+        os.execv(sys.executable, [sys.executable, main_py] + sys.argv[1:])
@@ -0,0 +1,200 @@
+# embed.py - compile-once, run-many API for hosts embedding DLBA (v0.8)
+#
+#   prog = compile_program('let total = price * qty', filename="<rules>")
+#   prog.run({"price": 3, "qty": 4})["total"]           # -> 12
+#
+#   template = Template('import "rules_lib.dlba"')       # runs once
+#   pool = EnvironmentPool(template, size=16)
+#   prog.run({"price": 3, "qty": 4}, env=pool.acquire())
+#
+#   score = compile_function('func score(a, b) { return a * b }', "score")
+#   score(6, 7)                                           # -> 42
+from collections import deque
+from parser import Parser
+
+from ast_nodes import Assign, FunctionDef, Import
+from env import Environment
+from interpreter import FunctionValue, ReturnException, default_interpreter
+from lexer import tokenize
+
+
+def _parse(interp, code, filename):
+    return Parser(tokenize(code, filename=filename, source_map=interp.source_map)).parse()
+
+
+def _bound_names(statements):
+    # names bound by top-level statements, in first-binding order
+    names = []
+    for stmt in statements:
+        if isinstance(stmt, (Assign, FunctionDef)):
+            new = [stmt.name]
+        elif isinstance(stmt, Import) and stmt.names:
+            new = stmt.names
+        elif isinstance(stmt, Import) and stmt.as_name:
+            new = [stmt.as_name]
+        else:
+            new = []
+        names.extend(n for n in new if n not in names)
+    return names
+
+
+class RunResult:
+    """Outcome of one Program.run: top-level `return` value and bindings."""
+
+    def __init__(self, value, bindings):
+        self.value = value
+        self.bindings = bindings
+
+    def __getitem__(self, name):
+        return self.bindings[name]
+
+    def __repr__(self):
+        return f"RunResult(value={self.value!r}, bindings={self.bindings!r})"
+
+
+class Program:
+    """
+    A program parsed once and run many times, each run in its own
+    environment with its own input bindings.
+    """
+
+    def __init__(self, statements, filename="<embed>", interp=None):
+        self.statements = statements
+        self.filename = filename
+        self.interp = interp or default_interpreter()
+        self.names = _bound_names(statements)
+
+    def new_env(self):
+        env = Environment()
+        self.interp.register_stdlib(env)
+        return env
+
+    def run(self, bindings=None, env=None, outputs=None):
+        """
+        Run the program with bindings declared as globals. env defaults to a
+        fresh environment (pass one from an EnvironmentPool to start from a
+        template). Returns a RunResult holding the value of a top-level
+        `return` and the names in outputs (default: every name the program
+        binds at top level).
+        """
+        env = env if env is not None else self.new_env()
+        for name, value in (bindings or {}).items():
+            env.declare(name, value)
+        value = None
+        try:
+            self.interp.interpret(self.statements, env, current_filename=self.filename)
+        except ReturnException as r:
+            value = r.value
+        names = self.names if outputs is None else outputs
+        return RunResult(value, {n: env.get(n) for n in names if env.exists(n)})
+
+
+class FunctionHandle:
+    """A compiled DLBA function callable from Python."""
+
+    def __init__(self, fv, interp):
+        self.fv = fv
+        self.interp = interp
+
+    def __call__(self, *args):
+        return self.interp.call_function(self.fv, list(args))
+
+
+class Template:
+    """
+    A pre-initialized environment (stdlib, imports, helper functions) that
+    fresh per-run environments are cloned from.
+    """
+
+    def __init__(self, prelude="", filename="<template>", interp=None):
+        self.interp = interp or default_interpreter()
+        self.env = Environment()
+        self.interp.register_stdlib(self.env)
+        if prelude:
+            statements = _parse(self.interp, prelude, filename)
+            self.interp.interpret(statements, self.env, current_filename=filename)
+
+    def clone(self):
+        """
+        A fresh environment equivalent to the template: functions defined by
+        the prelude are rebound to the clone and list/dict data is copied, so
+        runs never see each other's changes. That includes the program scope
+        above it (`dlba` and any builtins the prelude rebound), which each
+        clone gets its own copy of. Module envs stay shared.
+        """
+        src = self.env
+        scope = Environment(parent=src.parent.parent)
+        env = Environment(parent=scope)
+        for name, value in src.parent.vars.items():
+            scope.vars[name] = _clone_value(value, src, env)
+        env.views = list(src.views)
+        env.linked = list(src.linked)
+        for name, value in src.vars.items():
+            env.vars[name] = _clone_value(value, src, env)
+        return env
+
+
+def _clone_value(value, old_env, new_env):
+    if isinstance(value, FunctionValue) and value.closure_env is old_env:
+        return FunctionValue(
+            value.params,
+            value.body,
+            new_env,
+            name=value.name,
+            def_filename=value.def_filename,
+            def_lineno=value.def_lineno,
+        )
+    if isinstance(value, list):
+        return [_clone_value(v, old_env, new_env) for v in value]
+    if isinstance(value, dict):
+        return {k: _clone_value(v, old_env, new_env) for k, v in value.items()}
+    return value
+
+
+class EnvironmentPool:
+    """
+    Hands out fresh environments cloned from a template. Clones are made
+    ahead of time (prefill) so acquire() is usually just a pop; environments
+    are used once and never returned.
+    """
+
+    def __init__(self, template, size=8):
+        self.template = template
+        self.size = size
+        self._ready = deque()
+        self.prefill()
+
+    def prefill(self, n=None):
+        target = self.size if n is None else n
+        while len(self._ready) < target:
+            self._ready.append(self.template.clone())
+
+    def acquire(self):
+        try:
+            return self._ready.popleft()
+        except IndexError:
+            return self.template.clone()
+
+
+def compile_program(code, filename="<embed>", interp=None):
+    interp = interp or default_interpreter()
+    return Program(_parse(interp, code, filename), filename=filename, interp=interp)
+
+
+def compile_function(code, name, filename="<embed>", template=None, interp=None):
+    """
+    Run code once (in template's environment if given) and return a handle
+    to the DLBA function it defines under name.
+    """
+    if template is not None:
+        interp = template.interp
+        env = template.env
+    else:
+        interp = interp or default_interpreter()
+        env = Environment()
+        interp.register_stdlib(env)
+    interp.interpret(_parse(interp, code, filename), env, current_filename=filename)
+    fv = env.get(name)
+    if not isinstance(fv, FunctionValue):
+        raise Exception(f"'{name}' is not a DLBA function in {filename}")
+    return FunctionHandle(fv, interp)
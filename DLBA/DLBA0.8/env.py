@@ -1,8 +1,81 @@
 # env.py - environment with lexical scoping (v0.8)
+from collections.abc import Mapping
+
+
+class Namespace(Mapping):
+    # read-only live view of a scope's own bindings plus everything it got
+    # through its own wildcard imports, so `import` chains keep working
+    def __init__(self, env):
+        self._env = env
+
+    def __getitem__(self, name):
+        env = self._env
+        if name in env.vars:
+            return env.vars[name]
+        for view in env.views:
+            if name in view:
+                return view[name]
+        raise KeyError(name)
+
+    def __contains__(self, name):
+        env = self._env
+        if name in env.vars:
+            return True
+        for view in env.views:
+            if name in view:
+                return True
+        return False
+
+    def __iter__(self):
+        seen = set()
+        for name in self._env.vars:
+            seen.add(name)
+            yield name
+        for view in self._env.views:
+            for name in view:
+                if name not in seen:
+                    seen.add(name)
+                    yield name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
 class Environment:
     def __init__(self, parent=None):
         self.parent = parent
         self.vars = {}
+        # read-only module namespaces linked by wildcard imports (newest first)
+        self.views = []
+        self.linked = []  # the environments behind self.views
+        self._namespace = None
+
+    def __getstate__(self):
+        # views are rebuilt from self.linked
+        state = self.__dict__.copy()
+        state["views"] = None
+        state["_namespace"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.views = [env.namespace() for env in self.linked]
+
+    def namespace(self):
+        # read-only live view of this scope (shared by all importers)
+        if self._namespace is None:
+            self._namespace = Namespace(self)
+        return self._namespace
+
+    def link(self, other):
+        # wildcard import: names of other's namespace take priority over earlier
+        # bindings of this scope (as the old copy did); later declarations
+        # shadow them again
+        view = other.namespace()
+        for name in [k for k in self.vars if k in view]:
+            del self.vars[name]
+        self.views = [view] + [v for v in self.views if v is not view]
+        self.linked = [other] + [e for e in self.linked if e is not other]
 
     def declare(self, name, value):
         # declare in current scope (used for let and module bindings)
@@ -13,7 +86,17 @@ class Environment:
         if name in self.vars:
             self.vars[name] = value
             return
+        for view in self.views:
+            if name in view:
+                # views are read-only: rebinding an imported name shadows it locally
+                self.vars[name] = value
+                return
         if self.parent:
+            if isinstance(self.parent, FrozenEnvironment) and name in self.parent.vars:
+                # assigning a builtin rebinds it in the program scope
+                # (the one right above the shared builtins)
+                self.vars[name] = value
+                return
             self.parent.set(name, value)
             return
         raise Exception(f"Undefined variable '{name}'")
@@ -21,6 +104,9 @@ class Environment:
     def get(self, name):
         if name in self.vars:
             return self.vars[name]
+        for view in self.views:
+            if name in view:
+                return view[name]
         if self.parent:
             return self.parent.get(name)
         raise Exception(f"Undefined variable '{name}'")
@@ -28,6 +114,31 @@ class Environment:
     def exists(self, name):
         if name in self.vars:
             return True
+        for view in self.views:
+            if name in view:
+                return True
         if self.parent:
             return self.parent.exists(name)
         return False
+
+
+class FrozenEnvironment(Environment):
+    # immutable scope shared by every program (the builtins); bindings are
+    # fixed once freeze() is called
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.frozen = False
+
+    def freeze(self):
+        self.frozen = True
+        return self
+
+    def declare(self, name, value):
+        if self.frozen:
+            raise Exception(f"Cannot declare '{name}' in the builtins scope")
+        super().declare(name, value)
+
+    def set(self, name, value):
+        if self.frozen and name in self.vars:
+            raise Exception(f"Cannot reassign builtin '{name}' (use let to shadow it)")
+        super().set(name, value)
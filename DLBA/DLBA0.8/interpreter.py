@@ -1,20 +1,24 @@
 # interpreter.py - DLBA interpreter (v0.8)
+import hashlib
+import marshal
 import os
+import pickle
+from contextlib import nullcontext
 
 from ast_nodes import *
-from env import Environment
-from lexer import SOURCE_MAP
+from env import Environment, FrozenEnvironment
+from lexer import SOURCE_MAP, SourceMap
+from modcache import ModuleCache
 
-# module cache & loading guard
-_loaded_modules = {}  # abs_path -> module_env
-_loading = set()
-
-# call stack for runtime traces
-_call_stack = []
-
-
-def get_call_stack():
-    return list(_call_stack)
+# default on-disk parse cache directory shared between processes (used by
+# --batch); enabled by pointing it at a directory, e.g. $DLBA_CACHE_DIR
+PARSE_CACHE_DIR = os.environ.get("DLBA_CACHE_DIR")
+PARSE_CACHE_VERSION = 3
+# files at least this big are lexed while they are read (see lexer.tokenize_file)
+STREAM_LEX_THRESHOLD = 1 << 20
+# lex and parse big files on this many processes instead (parser.parse_parallel), e.g.
+# $DLBA_LEX_WORKERS=8 for multi-megabyte generated sources; 0 disables it
+LEX_WORKERS = int(os.environ.get("DLBA_LEX_WORKERS") or 0)
 
 
 class ReturnException(Exception):
@@ -145,99 +149,6 @@ class FileValue:
         return None
 
 
-# -------------------------
-# Interpreter core
-# -------------------------
-def interpret(statements, env, current_filename=None):
-    for stmt in statements:
-        execute(stmt, env)
-
-
-def execute(node, env):
-    if isinstance(node, Assign):
-        val = evaluate(node.expr, env)
-        if node.declare:
-            env.declare(node.name, val)
-        else:
-            if env.exists(node.name):
-                env.set(node.name, val)
-            else:
-                raise Exception(
-                    f"Undefined variable '{node.name}' at {node.filename}:{node.lineno}:{getattr(node,'col',None)}"
-                )
-        return None
-
-    if isinstance(node, FunctionDef):
-        fv = FunctionValue(
-            node.params,
-            node.body,
-            env,
-            name=node.name,
-            def_filename=node.filename,
-            def_lineno=node.lineno,
-        )
-        env.declare(node.name, fv)
-        return None
-
-    if isinstance(node, Return):
-        val = evaluate(node.expr, env) if node.expr is not None else None
-        raise ReturnException(val)
-
-    if isinstance(node, Print):
-        val = evaluate(node.expr, env)
-        print(val)
-        return None
-
-    if isinstance(node, If):
-        if truthy(evaluate(node.condition, env)):
-            for s in node.then_branch:
-                execute(s, env)
-            return None
-        for econd, ebranch in node.elif_branches:
-            if truthy(evaluate(econd, env)):
-                for s in ebranch:
-                    execute(s, env)
-                return None
-        if node.else_branch:
-            for s in node.else_branch:
-                execute(s, env)
-        return None
-
-    if isinstance(node, While):
-        while truthy(evaluate(node.condition, env)):
-            for s in node.body:
-                execute(s, env)
-        return None
-
-    if isinstance(node, Import):
-        _handle_import(node, env)
-        return None
-
-    # expression statement (like call)
-    if isinstance(
-        node,
-        (
-            Call,
-            Var,
-            ModuleAccess,
-            Index,
-            ListLiteral,
-            DictLiteral,
-            BinOp,
-            UnaryOp,
-            Number,
-            String,
-            Boolean,
-        ),
-    ):
-        _ = evaluate(node, env)
-        return None
-
-    raise Exception(
-        f"Unknown statement type: {type(node)} at {getattr(node,'filename',None)}:{getattr(node,'lineno',None)}"
-    )
-
-
 # -------------------------
 # Module / package resolver
 # -------------------------
@@ -288,269 +199,42 @@ def _resolve_module_path(import_node):
     return os.path.abspath(fallback)
 
 
-def _handle_import(node, env):
-    abs_path = _resolve_module_path(node)
-    if abs_path in _loaded_modules:
-        module_env = _loaded_modules[abs_path]
-    else:
-        if abs_path in _loading:
-            raise Exception(
-                f"Circular import detected for {abs_path} at {node.filename}:{node.lineno}:{getattr(node,'col',None)}"
-            )
-        if not os.path.exists(abs_path):
-            raise Exception(
-                f"Module file not found: {abs_path} at {node.filename}:{node.lineno}:{getattr(node,'col',None)}"
-            )
-        _loading.add(abs_path)
-        try:
-            with open(abs_path, "r", encoding="utf-8") as f:
-                code = f.read()
-            from parser import Parser
-
-            from lexer import tokenize
-
-            toks = tokenize(code, filename=abs_path)
-            parser = Parser(toks)
-            stmts = parser.parse()
-            module_env = Environment(parent=None)
-            # register stdlib for module env as well
-            register_stdlib(module_env)
-            interpret(stmts, module_env)
-            _loaded_modules[abs_path] = module_env
-        finally:
-            _loading.discard(abs_path)
-    # import behavior
-    if node.names:
-        for name in node.names:
-            try:
-                val = module_env.get(name)
-            except Exception:
-                raise Exception(
-                    f"Module {abs_path} has no name '{name}' at {node.filename}:{node.lineno}:{getattr(node,'col',None)}"
-                )
-            env.declare(name, val)
-    elif node.as_name:
-        modval = ModuleValue(module_env, name=node.as_name, path=abs_path)
-        env.declare(node.as_name, modval)
-    else:
-        for k, v in module_env.vars.items():
-            env.declare(k, v)
-
-
 # -------------------------
-# Function calling / evaluation
+# On-disk parse cache
 # -------------------------
-def _call_function_value(fv, arg_vals):
-    call_env = Environment(parent=fv.closure_env)
-    for i, pname in enumerate(fv.params):
-        pval = arg_vals[i] if i < len(arg_vals) else None
-        call_env.declare(pname, pval)
-    _call_stack.append((fv.name or "<anonymous>", fv.def_filename, fv.def_lineno))
+def _disk_cache_path(cache_dir, key):
+    digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, digest + ".pickle")
+
+
+def _read_disk_cache(cache_dir, key, st):
     try:
-        for s in fv.body:
-            execute(s, call_env)
-    except ReturnException as re:
-        _call_stack.pop()
-        return re.value
+        with open(_disk_cache_path(cache_dir, key), "rb") as f:
+            version, mtime_ns, size, stmts = pickle.load(f)
     except Exception:
-        _call_stack.pop()
-        raise
-    _call_stack.pop()
-    return None
+        return None
+    if (version, mtime_ns, size) != (PARSE_CACHE_VERSION, st.st_mtime_ns, st.st_size):
+        return None
+    return stmts
 
 
-def evaluate(node, env):
-    if isinstance(node, Number):
-        return node.value
-    if isinstance(node, String):
-        return node.value
-    if isinstance(node, Boolean):
-        return node.value
-    if isinstance(node, Var):
-        try:
-            v = env.get(node.name)
-            return v
-        except Exception:
-            col = getattr(node, "col", None)
-            if col:
-                raise Exception(
-                    f"Undefined variable '{node.name}' at {node.filename}:{node.lineno}:{col}"
-                )
-            else:
-                raise Exception(
-                    f"Undefined variable '{node.name}' at {node.filename}:{node.lineno}"
-                )
-    if isinstance(node, UnaryOp):
-        val = evaluate(node.operand, env)
-        if node.op == "!":
-            return not truthy(val)
-        if node.op == "-":
-            if isinstance(val, (int, float)):
-                return -val
-            raise Exception(
-                f"Unary '-' applied to non-number at {node.filename}:{node.lineno}:{getattr(node,'col',None)}"
-            )
-        raise Exception(
-            f"Unknown unary operator: {node.op} at {node.filename}:{node.lineno}"
-        )
-    if isinstance(node, BinOp):
-        op = node.op
-        # short-circuit for logicals
-        if op == "||":
-            left = evaluate(node.left, env)
-            if truthy(left):
-                return True
-            right = evaluate(node.right, env)
-            return truthy(right)
-        if op == "&&":
-            left = evaluate(node.left, env)
-            if not truthy(left):
-                return False
-            right = evaluate(node.right, env)
-            return truthy(right)
-        left = evaluate(node.left, env)
-        right = evaluate(node.right, env)
+def _write_disk_cache(cache_dir, key, st, stmts):
+    # write to a temp file and rename so concurrent readers never see a
+    # partial entry
+    target = _disk_cache_path(cache_dir, key)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(tmp, "wb") as f:
+            entry = (PARSE_CACHE_VERSION, st.st_mtime_ns, st.st_size, stmts)
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, target)
+    except Exception:
+        # the cache is an optimization only
         try:
-            if op == "+":
-                if isinstance(left, str) or isinstance(right, str):
-                    return str(left) + str(right)
-                return left + right
-            if op == "-":
-                return left - right
-            if op == "*":
-                return left * right
-            if op == "/":
-                return left / right
-            if op == "%":
-                return left % right
-            if op == "<":
-                return left < right
-            if op == ">":
-                return left > right
-            if op == "<=":
-                return left <= right
-            if op == ">=":
-                return left >= right
-            if op == "==":
-                return left == right
-            if op == "!=":
-                return left != right
-        except Exception as e:
-            raise Exception(
-                f"Error during binary op '{op}': {e} at {node.filename}:{node.lineno}:{getattr(node,'col',None)}"
-            )
-        raise Exception(
-            f"Unknown binary operator: {op} at {node.filename}:{node.lineno}:{getattr(node,'col',None)}"
-        )
-    if isinstance(node, Call):
-        callee_val = evaluate(node.callee, env)
-        arg_vals = [evaluate(a, env) for a in node.args]
-        # FunctionValue
-        if isinstance(callee_val, FunctionValue):
-            return _call_function_value(callee_val, arg_vals)
-        # NativeFunction
-        if isinstance(callee_val, NativeFunction):
-            try:
-                return callee_val.call(arg_vals)
-            except Exception as e:
-                raise Exception(
-                    f"Error in native function {callee_val.name}: {e} at {node.filename}:{node.lineno}:{getattr(node,'col',None)}"
-                )
-        # NativeMethod bound
-        if isinstance(callee_val, NativeMethod):
-            try:
-                return callee_val.call(arg_vals)
-            except Exception as e:
-                raise Exception(
-                    f"Error in native method {callee_val.method_name}: {e} at {node.filename}:{node.lineno}:{getattr(node,'col',None)}"
-                )
-        raise Exception(
-            f"Attempt to call a non-function value at {node.filename}:{node.lineno}:{getattr(node,'col',None)}"
-        )
-    if isinstance(node, ModuleAccess):
-        obj = evaluate(node.obj, env)
-        # Module member access (module object)
-        if isinstance(obj, ModuleValue):
-            try:
-                return obj.get_member(node.member)
-            except Exception:
-                raise Exception(
-                    f"Module has no member '{node.member}' at {node.filename}:{node.lineno}:{getattr(node,'col',None)}"
-                )
-        # For python-level instances (list/dict/str/FileValue), return a NativeMethod wrapper
-        if (
-            isinstance(obj, list)
-            or isinstance(obj, dict)
-            or isinstance(obj, str)
-            or isinstance(obj, FileValue)
-        ):
-            # return a callable native-method wrapper
-            return NativeMethod(obj, node.member)
-        # For dicts, allow obj['key'] via ModuleAccess too? Prefer Index usage
-        # If object is a Python dict and member is present as key, return it
-        if isinstance(obj, dict) and node.member in obj:
-            return obj[node.member]
-        raise Exception(
-            f"Cannot access member '{node.member}' of non-module/non-object at {node.filename}:{node.lineno}:{getattr(node,'col',None)}"
-        )
-    if isinstance(node, ListLiteral):
-        return [evaluate(e, env) for e in node.elements]
-    if isinstance(node, DictLiteral):
-        d = {}
-        for k_node, v_node in node.pairs:
-            key = evaluate(k_node, env)
-            if not isinstance(key, str):
-                key = str(key)
-            d[key] = evaluate(v_node, env)
-        return d
-    if isinstance(node, Index):
-        target = evaluate(node.target, env)
-        idx_expr = node.index_expr
-        # slicing
-        if isinstance(idx_expr, Slice):
-            start = (
-                evaluate(idx_expr.start, env) if idx_expr.start is not None else None
-            )
-            stop = evaluate(idx_expr.stop, env) if idx_expr.stop is not None else None
-            if isinstance(target, list):
-                return target[slice(start, stop)]
-            if isinstance(target, str):
-                return target[slice(start, stop)]
-            raise Exception(
-                f"Slicing not supported on this value at {node.filename}:{node.lineno}:{getattr(node,'col',None)}"
-            )
-        else:
-            idx = evaluate(idx_expr, env)
-            if isinstance(target, list):
-                if not isinstance(idx, int):
-                    raise Exception(
-                        f"List index must be integer at {node.filename}:{node.lineno}:{getattr(node,'col',None)}"
-                    )
-                try:
-                    return target[idx]
-                except IndexError:
-                    raise Exception(
-                        f"List index out of range at {node.filename}:{node.lineno}:{getattr(node,'col',None)}"
-                    )
-            if isinstance(target, dict):
-                return target.get(idx, None)
-            if isinstance(target, str):
-                if not isinstance(idx, int):
-                    raise Exception(
-                        f"String index must be integer at {node.filename}:{node.lineno}:{getattr(node,'col',None)}"
-                    )
-                try:
-                    return target[idx]
-                except Exception:
-                    raise Exception(
-                        f"String index error at {node.filename}:{node.lineno}:{getattr(node,'col',None)}"
-                    )
-            raise Exception(
-                f"Indexing not supported on this value at {node.filename}:{node.lineno}:{getattr(node,'col',None)}"
-            )
-    raise Exception(
-        f"Cannot evaluate node of type: {type(node)} at {getattr(node,'filename',None)}:{getattr(node,'lineno',None)}"
-    )
+            os.unlink(tmp)
+        except OSError:
+            pass
 
 
 def truthy(value):
@@ -570,8 +254,8 @@ def truthy(value):
 # -------------------------
 # Standard library support (extended)
 # -------------------------
-def register_stdlib(env):
-    # minimal native wrappers
+def _make_builtins():
+    # minimal native wrappers (built once per process, see BUILTINS)
     def _len(x):
         try:
             return len(x)
@@ -629,45 +313,759 @@ def register_stdlib(env):
         "open": NativeFunction(_open, "open"),
         "range": NativeFunction(_range, "range"),
     }
-    # add dlba module info container
-    dlba_mod = {
-        "argv": [],
-    }
+    scope = FrozenEnvironment()
     for k, v in natives.items():
-        env.declare(k, v)
-    env.declare("dlba", dlba_mod)
+        scope.declare(k, v)
+    return scope.freeze()
+
+
+# one shared, immutable builtins scope that every program falls back to
+BUILTINS = _make_builtins()
+
+
+def register_stdlib(env):
+    # natives live in BUILTINS; a program only gets its own `dlba` info
+    # container, held in a small scope between env and the builtins
+    program_scope = Environment(parent=BUILTINS)
+    program_scope.declare("dlba", {"argv": []})
+    env.parent = program_scope
+
+
+def _program_scope(env):
+    # the scope right above BUILTINS (holds `dlba`)
+    while env is not None and env.parent is not None:
+        if env.parent is BUILTINS:
+            return env
+        env = env.parent
+    return BUILTINS
+
+
+def _module_scope(env):
+    # a module's own scope above BUILTINS: builtins it reassigns stay in the
+    # module, while `dlba` is the importing program's (see rebind_modules)
+    scope = Environment(parent=BUILTINS)
+    scope.declare("dlba", _program_scope(env).vars.get("dlba"))
+    return scope
+
+
+# -------------------------
+# Interpreter core
+# -------------------------
+class Interpreter:
+    """
+    One DLBA runtime. It owns all mutable interpreter state (module cache,
+    loading guard, call stack, parse caches and source map), so independent
+    instances can run side by side, e.g. one per thread. Only the frozen
+    BUILTINS scope is shared between instances.
+    """
+
+    def __init__(
+        self,
+        source_map=None,
+        stdout=None,
+        parse_cache_dir=None,
+        max_modules=None,
+        max_module_bytes=None,
+        reload_changed=False,
+        lex_workers=0,
+        optimize=0,
+    ):
+        # abs_path -> module_env, LRU-bounded when max_modules/max_module_bytes are set
+        self.loaded_modules = ModuleCache(
+            max_modules, max_module_bytes, on_evict=self._forget_module
+        )
+        # re-load a cached module on import when it or anything it imports changed on disk
+        self.reload_changed = reload_changed
+        self.module_mtimes = {}  # abs_path -> st_mtime_ns when it was loaded
+        self.module_deps = {}  # importing file (abs path) -> abs paths it imports
+        self.loading = set()
+        # call stack for runtime traces
+        self.call_stack = []
+        # pre-parsed modules supplied by a linked artifact (resolved key -> statements)
+        self.prelinked = {}
+        # parsed-AST cache: (abs_path, path, optimize) -> (mtime_ns, size, statements)
+        self.parse_cache = {}
+        self.parse_cache_dir = parse_cache_dir
+        self.lex_workers = lex_workers
+        # 1 (-O) / 2 (-OO): parse without node positions, see Parser
+        self.optimize = optimize
+        # a timings.Timings to record phases and imports in (--timings)
+        self.timings = None
+        # filename -> source lines, for tracebacks
+        self.source_map = SourceMap() if source_map is None else source_map
+        # where print and tracebacks go (None: the current sys.stdout)
+        self.stdout = stdout
+
+    def get_call_stack(self):
+        return list(self.call_stack)
+
+    def phase(self, name):
+        # context manager timing one phase of the run when timings are on
+        if self.timings is None:
+            return nullcontext()
+        return self.timings.phase(name)
+
+    def register_stdlib(self, env):
+        register_stdlib(env)
+
+    def interpret(self, statements, env, current_filename=None):
+        for stmt in statements:
+            self.execute(stmt, env)
+
+    def execute(self, node, env):
+        if isinstance(node, Assign):
+            val = self.evaluate(node.expr, env)
+            if node.declare:
+                env.declare(node.name, val)
+            else:
+                if env.exists(node.name):
+                    env.set(node.name, val)
+                else:
+                    raise Exception(
+                        f"Undefined variable '{node.name}' at {self._at(node)}"
+                    )
+            return None
+
+        if isinstance(node, FunctionDef):
+            fv = FunctionValue(
+                node.params,
+                node.body,
+                env,
+                name=node.name,
+                def_filename=node.filename,
+                def_lineno=node.lineno,
+            )
+            env.declare(node.name, fv)
+            return None
+
+        if isinstance(node, Return):
+            val = self.evaluate(node.expr, env) if node.expr is not None else None
+            raise ReturnException(val)
+
+        if isinstance(node, Print):
+            val = self.evaluate(node.expr, env)
+            print(val, file=self.stdout)
+            return None
+
+        if isinstance(node, If):
+            if truthy(self.evaluate(node.condition, env)):
+                for s in node.then_branch:
+                    self.execute(s, env)
+                return None
+            for econd, ebranch in node.elif_branches:
+                if truthy(self.evaluate(econd, env)):
+                    for s in ebranch:
+                        self.execute(s, env)
+                    return None
+            if node.else_branch:
+                for s in node.else_branch:
+                    self.execute(s, env)
+            return None
+
+        if isinstance(node, While):
+            while truthy(self.evaluate(node.condition, env)):
+                for s in node.body:
+                    self.execute(s, env)
+            return None
+
+        if isinstance(node, Import):
+            self._handle_import(node, env)
+            return None
+
+        # expression statement (like call)
+        if isinstance(
+            node,
+            (
+                Call,
+                Var,
+                ModuleAccess,
+                Index,
+                ListLiteral,
+                DictLiteral,
+                Constant,
+                BinOp,
+                UnaryOp,
+                Number,
+                String,
+                Boolean,
+            ),
+        ):
+            _ = self.evaluate(node, env)
+            return None
+
+        raise Exception(
+            f"Unknown statement type: {type(node)} at {getattr(node,'filename',None)}:{getattr(node,'lineno',None)}"
+        )
+
+    # -------------------------
+    # Module loading
+    # -------------------------
+    def install_prelinked(self, modules):
+        # make pre-parsed modules importable without touching the filesystem
+        self.prelinked.update(modules)
+
+    def parse_file(self, path):
+        # read, tokenize and parse a source file into its top-level statements;
+        # the result is reused until the file changes on disk
+        from parser import Parser, StreamParser, parse_parallel
+
+        from lexer import PARALLEL_MIN_SIZE, tokenize, tokenize_file
+
+        st = os.stat(path)
+        key = (os.path.abspath(path), path, self.optimize)
+        # a SourceMap re-reads disk files on demand; plain dicts keep the lines
+        lazy = isinstance(self.source_map, SourceMap)
+        hit = self.parse_cache.get(key)
+        if hit and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+            return hit[2]
+        stmts = None
+        if self.parse_cache_dir:
+            with self.phase("disk cache"):
+                stmts = _read_disk_cache(self.parse_cache_dir, key, st)
+        if stmts is None:
+            if st.st_size >= STREAM_LEX_THRESHOLD and not (
+                self.lex_workers > 1 and st.st_size >= PARALLEL_MIN_SIZE
+            ):
+                # big (often data-carrying) file: never hold its text or token list
+                with self.phase("tokenize+parse"):
+                    toks = tokenize_file(path, source_map=self.source_map)
+                    stmts = StreamParser(toks, optimize=self.optimize).parse()
+            else:
+                with self.phase("read"):
+                    with open(path, "r", encoding="utf-8") as f:
+                        code = f.read()
+                if self.lex_workers > 1 and st.st_size >= PARALLEL_MIN_SIZE:
+                    with self.phase("tokenize+parse"):
+                        stmts = parse_parallel(
+                            code,
+                            filename=path,
+                            source_map=self.source_map,
+                            keep_source=not lazy,
+                            workers=self.lex_workers,
+                            optimize=self.optimize,
+                        )
+                else:
+                    with self.phase("tokenize"):
+                        toks = tokenize(
+                            code,
+                            filename=path,
+                            source_map=self.source_map,
+                            keep_source=not lazy,
+                        )
+                    with self.phase("parse"):
+                        stmts = Parser(toks, optimize=self.optimize).parse()
+            if self.parse_cache_dir:
+                _write_disk_cache(self.parse_cache_dir, key, st, stmts)
+        if lazy:
+            self.source_map.add_file(path, st)
+        self.parse_cache[key] = (st.st_mtime_ns, st.st_size, stmts)
+        return stmts
+
+    def invalidate_modules(self, paths):
+        """
+        Forget the given modules and every module that (transitively) imports
+        them, so the next import loads them again. Returns the forgotten paths.
+        """
+        importers = {}
+        for src, targets in self.module_deps.items():
+            for target in targets:
+                importers.setdefault(target, set()).add(src)
+        stale = set()
+        todo = list(paths)
+        while todo:
+            path = todo.pop()
+            if path in stale:
+                continue
+            stale.add(path)
+            todo.extend(importers.get(path, ()))
+        for path in stale:
+            self.loaded_modules.pop(path)
+            self._forget_module(path)
+            # edges are recorded again when the module is re-executed
+            self.module_deps.pop(path, None)
+        return stale
+
+    def unload(self, path):
+        """
+        Drop a module (path as imported, relative to the cwd, or absolute) and
+        the modules that import it from the cache. Returns the dropped paths.
+        """
+        return self.invalidate_modules([os.path.abspath(path)])
+
+    def _forget_module(self, path):
+        # release what is kept alongside a module that left the cache
+        self.module_mtimes.pop(path, None)
+        self.source_map.pop(path, None)
+        for key in [k for k in self.parse_cache if k[0] == path]:
+            del self.parse_cache[key]
+
+    def _changed_on_disk(self, path):
+        # the module or anything it (transitively) imports was edited
+        seen = set()
+        todo = [path]
+        while todo:
+            p = todo.pop()
+            if p in seen:
+                continue
+            seen.add(p)
+            if p in self.module_mtimes:
+                if not os.path.exists(p) or os.stat(p).st_mtime_ns != self.module_mtimes[p]:
+                    return True
+            todo.extend(self.module_deps.get(p, ()))
+        return False
+
+    def drop_stale_modules(self):
+        # forget cached modules whose source changed (or came from a linked
+        # artifact), and their importers, so the next import loads them again
+        stale = []
+        for path in self.loaded_modules:
+            if path in self.prelinked:
+                stale.append(path)
+                continue
+            mtime = self.module_mtimes.get(path)
+            if not os.path.exists(path) or os.stat(path).st_mtime_ns != mtime:
+                stale.append(path)
+        self.invalidate_modules(stale)
+        self.prelinked.clear()
+
+    def rebind_modules(self, env):
+        # cached modules outlive the run that loaded them (server, batch
+        # workers): point their `dlba` at the program running in env
+        dlba = _program_scope(env).vars.get("dlba")
+        for _, module_env in self.loaded_modules.items():
+            scope = module_env.parent
+            if scope is not None and "dlba" in scope.vars:
+                scope.vars["dlba"] = dlba
+
+    def _handle_import(self, node, env):
+        if self.timings is None:
+            return self._import(node, env)
+        with self.timings.module(node.path):
+            return self._import(node, env)
+
+    def _import(self, node, env):
+        # imports resolved at link time skip path probing entirely
+        abs_path = getattr(node, "resolved_path", None)
+        if abs_path not in self.prelinked:
+            with self.phase("resolve"):
+                abs_path = _resolve_module_path(node)
+            if node.filename and not node.filename.startswith("<"):
+                importer = os.path.abspath(node.filename)
+                self.module_deps.setdefault(importer, set()).add(abs_path)
+        if (
+            self.reload_changed
+            and abs_path in self.loaded_modules
+            and self._changed_on_disk(abs_path)
+        ):
+            self.invalidate_modules([abs_path])
+        if abs_path in self.loaded_modules:
+            module_env = self.loaded_modules[abs_path]
+        else:
+            if abs_path in self.loading:
+                raise Exception(
+                    f"Circular import detected for {abs_path} at {self._at(node)}"
+                )
+            if abs_path not in self.prelinked and not os.path.exists(abs_path):
+                raise Exception(
+                    f"Module file not found: {abs_path} at {self._at(node)}"
+                )
+            self.loading.add(abs_path)
+            try:
+                if abs_path in self.prelinked:
+                    stmts = self.prelinked[abs_path]
+                else:
+                    st = os.stat(abs_path)
+                    self.module_mtimes[abs_path] = st.st_mtime_ns
+                    stmts = self.parse_file(abs_path)
+                # modules see the builtins (and the program's `dlba`) through their parent
+                module_env = Environment(parent=_module_scope(env))
+                with self.phase("execute"):
+                    self.interpret(stmts, module_env)
+                self.loaded_modules.put(abs_path, module_env)
+            finally:
+                self.loading.discard(abs_path)
+        # import behavior
+        if node.names:
+            for name in node.names:
+                try:
+                    val = module_env.get(name)
+                except Exception:
+                    raise Exception(
+                        f"Module {abs_path} has no name '{name}' at {self._at(node)}"
+                    )
+                env.declare(name, val)
+            # imported functions close over module_env: keep it cached meanwhile
+            self.loaded_modules.pin(abs_path, env)
+        elif node.as_name:
+            modval = ModuleValue(module_env, name=node.as_name, path=abs_path)
+            self.loaded_modules.pin(abs_path, modval)
+            env.declare(node.as_name, modval)
+        else:
+            # link a read-only view of the module namespace instead of copying it
+            env.link(module_env)
+            self.loaded_modules.pin(abs_path, env)
+
+    # -------------------------
+    # Function calling / evaluation
+    # -------------------------
+    def call_function(self, fv, arg_vals):
+        call_env = Environment(parent=fv.closure_env)
+        for i, pname in enumerate(fv.params):
+            pval = arg_vals[i] if i < len(arg_vals) else None
+            call_env.declare(pname, pval)
+        self.call_stack.append(
+            (fv.name or "<anonymous>", fv.def_filename, fv.def_lineno)
+        )
+        try:
+            for s in fv.body:
+                self.execute(s, call_env)
+        except ReturnException as re:
+            self.call_stack.pop()
+            return re.value
+        except Exception:
+            self.call_stack.pop()
+            raise
+        self.call_stack.pop()
+        return None
+
+    def _evaluate_literal(self, node, env, value, start):
+        # the rest of a list/dict literal from item start on, once an item is
+        # itself a literal (too deep or too dynamic to be a Constant): nested
+        # literals get a [node, value, next item, pending key] frame on an
+        # explicit stack rather than one Python call per level. Items are
+        # still evaluated left to right, dict keys before their values
+        frames = [[node, value, start, None]]
+        while True:
+            frame = frames[-1]
+            lit, value, i = frame[0], frame[1], frame[2]
+            is_list = isinstance(value, list)
+            items = lit.elements if is_list else lit.pairs
+            if i == len(items):
+                frames.pop()
+                if not frames:
+                    return value
+                parent = frames[-1]
+                if isinstance(parent[1], list):
+                    parent[1].append(value)
+                else:
+                    parent[1][parent[3]] = value
+                parent[2] += 1
+                continue
+            if is_list:
+                item = items[i]
+            else:
+                k_node, item = items[i]
+                key = self.evaluate(k_node, env)
+                if not isinstance(key, str):
+                    key = str(key)
+                frame[3] = key
+            if isinstance(item, (ListLiteral, DictLiteral)):
+                frames.append([item, [] if isinstance(item, ListLiteral) else {}, 0, None])
+                continue
+            if is_list:
+                value.append(self.evaluate(item, env))
+            else:
+                value[frame[3]] = self.evaluate(item, env)
+            frame[2] = i + 1
+
+    def evaluate(self, node, env):
+        if isinstance(node, Number):
+            return node.value
+        if isinstance(node, String):
+            return node.value
+        if isinstance(node, Boolean):
+            return node.value
+        if isinstance(node, Var):
+            try:
+                v = env.get(node.name)
+                return v
+            except Exception:
+                raise Exception(f"Undefined variable '{node.name}' at {self._at(node)}")
+        if isinstance(node, UnaryOp):
+            val = self.evaluate(node.operand, env)
+            if node.op == "!":
+                return not truthy(val)
+            if node.op == "-":
+                if isinstance(val, (int, float)):
+                    return -val
+                raise Exception(
+                    f"Unary '-' applied to non-number at {self._at(node)}"
+                )
+            raise Exception(
+                f"Unknown unary operator: {node.op} at {self._at(node)}"
+            )
+        if isinstance(node, BinOp):
+            op = node.op
+            # short-circuit for logicals
+            if op == "||":
+                left = self.evaluate(node.left, env)
+                if truthy(left):
+                    return True
+                right = self.evaluate(node.right, env)
+                return truthy(right)
+            if op == "&&":
+                left = self.evaluate(node.left, env)
+                if not truthy(left):
+                    return False
+                right = self.evaluate(node.right, env)
+                return truthy(right)
+            left = self.evaluate(node.left, env)
+            right = self.evaluate(node.right, env)
+            try:
+                if op == "+":
+                    if isinstance(left, str) or isinstance(right, str):
+                        return str(left) + str(right)
+                    return left + right
+                if op == "-":
+                    return left - right
+                if op == "*":
+                    return left * right
+                if op == "/":
+                    return left / right
+                if op == "%":
+                    return left % right
+                if op == "<":
+                    return left < right
+                if op == ">":
+                    return left > right
+                if op == "<=":
+                    return left <= right
+                if op == ">=":
+                    return left >= right
+                if op == "==":
+                    return left == right
+                if op == "!=":
+                    return left != right
+            except Exception as e:
+                raise Exception(
+                    f"Error during binary op '{op}': {e} at {self._at(node)}"
+                )
+            raise Exception(
+                f"Unknown binary operator: {op} at {self._at(node)}"
+            )
+        if isinstance(node, Call):
+            callee_val = self.evaluate(node.callee, env)
+            arg_vals = [self.evaluate(a, env) for a in node.args]
+            # FunctionValue
+            if isinstance(callee_val, FunctionValue):
+                return self.call_function(callee_val, arg_vals)
+            # NativeFunction
+            if isinstance(callee_val, NativeFunction):
+                try:
+                    return callee_val.call(arg_vals)
+                except Exception as e:
+                    raise Exception(
+                        f"Error in native function {callee_val.name}: {e} at {self._at(node)}"
+                    )
+            # NativeMethod bound
+            if isinstance(callee_val, NativeMethod):
+                try:
+                    return callee_val.call(arg_vals)
+                except Exception as e:
+                    raise Exception(
+                        f"Error in native method {callee_val.method_name}: {e} at {self._at(node)}"
+                    )
+            raise Exception(
+                f"Attempt to call a non-function value at {self._at(node)}"
+            )
+        if isinstance(node, ModuleAccess):
+            obj = self.evaluate(node.obj, env)
+            # Module member access (module object)
+            if isinstance(obj, ModuleValue):
+                try:
+                    return obj.get_member(node.member)
+                except Exception:
+                    raise Exception(
+                        f"Module has no member '{node.member}' at {self._at(node)}"
+                    )
+            # For python-level instances (list/dict/str/FileValue), return a NativeMethod wrapper
+            if (
+                isinstance(obj, list)
+                or isinstance(obj, dict)
+                or isinstance(obj, str)
+                or isinstance(obj, FileValue)
+            ):
+                # return a callable native-method wrapper
+                return NativeMethod(obj, node.member)
+            # For dicts, allow obj['key'] via ModuleAccess too? Prefer Index usage
+            # If object is a Python dict and member is present as key, return it
+            if isinstance(obj, dict) and node.member in obj:
+                return obj[node.member]
+            raise Exception(
+                f"Cannot access member '{node.member}' of non-module/non-object at {self._at(node)}"
+            )
+        if isinstance(node, Constant):
+            return marshal.loads(node.data)
+        if isinstance(node, ListLiteral):
+            value = []
+            for e in node.elements:
+                if isinstance(e, (ListLiteral, DictLiteral)):
+                    return self._evaluate_literal(node, env, value, len(value))
+                value.append(self.evaluate(e, env))
+            return value
+        if isinstance(node, DictLiteral):
+            value = {}
+            for i, (k_node, v_node) in enumerate(node.pairs):
+                if isinstance(v_node, (ListLiteral, DictLiteral)):
+                    return self._evaluate_literal(node, env, value, i)
+                key = self.evaluate(k_node, env)
+                if not isinstance(key, str):
+                    key = str(key)
+                value[key] = self.evaluate(v_node, env)
+            return value
+        if isinstance(node, Index):
+            target = self.evaluate(node.target, env)
+            idx_expr = node.index_expr
+            # slicing
+            if isinstance(idx_expr, Slice):
+                start = (
+                    self.evaluate(idx_expr.start, env) if idx_expr.start is not None else None
+                )
+                stop = self.evaluate(idx_expr.stop, env) if idx_expr.stop is not None else None
+                if isinstance(target, list):
+                    return target[slice(start, stop)]
+                if isinstance(target, str):
+                    return target[slice(start, stop)]
+                raise Exception(
+                    f"Slicing not supported on this value at {self._at(node)}"
+                )
+            else:
+                idx = self.evaluate(idx_expr, env)
+                if isinstance(target, list):
+                    if not isinstance(idx, int):
+                        raise Exception(
+                            f"List index must be integer at {self._at(node)}"
+                        )
+                    try:
+                        return target[idx]
+                    except IndexError:
+                        raise Exception(
+                            f"List index out of range at {self._at(node)}"
+                        )
+                if isinstance(target, dict):
+                    return target.get(idx, None)
+                if isinstance(target, str):
+                    if not isinstance(idx, int):
+                        raise Exception(
+                            f"String index must be integer at {self._at(node)}"
+                        )
+                    try:
+                        return target[idx]
+                    except Exception:
+                        raise Exception(
+                            f"String index error at {self._at(node)}"
+                        )
+                raise Exception(
+                    f"Indexing not supported on this value at {self._at(node)}"
+                )
+        raise Exception(
+            f"Cannot evaluate node of type: {type(node)} at {getattr(node,'filename',None)}:{getattr(node,'lineno',None)}"
+        )
+
+    # -------------------------
+    # Traceback formatting
+    # -------------------------
+    def _at(self, node):
+        # "file:line[:col]" of node for error messages. Code parsed with -O has
+        # only filenames on its nodes: fall back to the line of the innermost
+        # function definition (absent with -OO) if node is in the same file
+        lineno = node.lineno
+        if lineno is not None:
+            col = node.col
+            return f"{node.filename}:{lineno}:{col}" if col else f"{node.filename}:{lineno}"
+        if self.call_stack:
+            _, def_filename, def_lineno = self.call_stack[-1]
+            if def_lineno is not None and def_filename == node.filename:
+                return f"{def_filename}:{def_lineno}"
+        return f"{node.filename}"
+
+    def format_traceback(self, exc):
+        out = self.stdout
+        print("---- DLBA Runtime Error ----", file=out)
+        # call stack
+        try:
+            cs = self.get_call_stack()
+            if cs:
+                print("Call stack (most recent call last):", file=out)
+                for name, filename, lineno in reversed(cs):
+                    where = filename if lineno is None else f"{filename}:{lineno}"
+                    print(f"  in {name} at {where}", file=out)
+        except Exception:
+            pass
+        # exception text
+        print("Error:", exc, file=out)
+        # attempt to find filename:lineno:col
+        import re
+
+        m = re.search(r"at ([^:]+):([0-9]+)(?::([0-9]+))?", str(exc))
+        if m:
+            fname = m.group(1)
+            lineno = int(m.group(2))
+            col = int(m.group(3)) if m.group(3) else None
+            lines = self.source_map.get(fname)
+            if lines is None and fname not in self.source_map and os.path.isfile(fname):
+                # parsed from the on-disk cache: read the source only now
+                # (a file the map knows about but that changed since is skipped)
+                try:
+                    with open(fname, "r", encoding="utf-8") as f:
+                        lines = f.read().splitlines()
+                except Exception:
+                    lines = None
+            if lines and 1 <= lineno <= len(lines):
+                src = lines[lineno - 1]
+                print(f'  File "{fname}", line {lineno}', file=out)
+                print("    " + src, file=out)
+                if col:
+                    prefix = src[: max(0, col - 1)].replace("\t", "    ")
+                    caret_pos = len(prefix)
+                    print("    " + " " * caret_pos + "^", file=out)
 
 
 # -------------------------
-# Traceback formatting
+# Default runtime (module-level API)
 # -------------------------
+# the plain functions below drive one shared default Interpreter, which
+# records sources in lexer.SOURCE_MAP like tokenize() does
+_default = Interpreter(
+    source_map=SOURCE_MAP, parse_cache_dir=PARSE_CACHE_DIR, lex_workers=LEX_WORKERS
+)
+
+
+def default_interpreter():
+    return _default
+
+
+def get_call_stack():
+    return _default.get_call_stack()
+
+
+def interpret(statements, env, current_filename=None):
+    _default.interpret(statements, env, current_filename)
+
+
+def execute(node, env):
+    return _default.execute(node, env)
+
+
+def evaluate(node, env):
+    return _default.evaluate(node, env)
+
+
+def install_prelinked(modules):
+    _default.install_prelinked(modules)
+
+
+def parse_file(path):
+    return _default.parse_file(path)
+
+
+def drop_stale_modules():
+    _default.drop_stale_modules()
+
+
+def rebind_modules(env):
+    _default.rebind_modules(env)
+
+
 def format_traceback(exc):
-    print("---- DLBA Runtime Error ----")
-    # call stack
-    try:
-        cs = get_call_stack()
-        if cs:
-            print("Call stack (most recent call last):")
-            for name, filename, lineno in reversed(cs):
-                print(f"  in {name} at {filename}:{lineno}")
-    except Exception:
-        pass
-    # exception text
-    print("Error:", exc)
-    # attempt to find filename:lineno:col
-    import re
-
-    m = re.search(r"at ([^:]+):([0-9]+)(?::([0-9]+))?", str(exc))
-    if m:
-        fname = m.group(1)
-        lineno = int(m.group(2))
-        col = int(m.group(3)) if m.group(3) else None
-        lines = SOURCE_MAP.get(fname)
-        if lines and 1 <= lineno <= len(lines):
-            src = lines[lineno - 1]
-            print(f'  File "{fname}", line {lineno}')
-            print("    " + src)
-            if col:
-                prefix = src[: max(0, col - 1)].replace("\t", "    ")
-                caret_pos = len(prefix)
-                print("    " + " " * caret_pos + "^")
+    _default.format_traceback(exc)
@@ -1,64 +1,142 @@
-# lexer.py - DLBA lexer (v0.8 - same as v0.7)
+# lexer.py - DLBA lexer (v0.8)
+import os
 import re
+import sys
 
-SOURCE_MAP = {}
 
-# token spec as in v0.7 (kept identical)
+class SourceMap:
+    """
+    filename -> source lines, used only to show the offending line in
+    tracebacks. Sources given as text (<stdin>, bundle members, embedded
+    programs) are kept as one string; files on disk are only stat'ed and
+    re-read when a line is actually needed, so the success path holds no
+    source text. Supports the dict operations the rest of the runtime uses.
+    """
+
+    def __init__(self):
+        self._text = {}  # filename -> source text
+        self._files = {}  # path -> (st_mtime_ns, st_size) when it was parsed
+
+    def add(self, filename, code):
+        self._files.pop(filename, None)
+        self._text[filename] = code
+
+    def add_file(self, path, st=None):
+        self._text.pop(path, None)
+        st = st or os.stat(path)
+        self._files[path] = (st.st_mtime_ns, st.st_size)
+
+    def get(self, filename, default=None):
+        text = self._text.get(filename)
+        if text is not None:
+            return text.splitlines()
+        sig = self._files.get(filename)
+        if sig is None:
+            return default
+        try:
+            st = os.stat(filename)
+            if (st.st_mtime_ns, st.st_size) != sig:
+                # edited since it was parsed: its lines no longer match the AST
+                return default
+            with open(filename, "r", encoding="utf-8") as f:
+                return f.read().splitlines()
+        except OSError:
+            return default
+
+    def __getitem__(self, filename):
+        lines = self.get(filename)
+        if lines is None:
+            raise KeyError(filename)
+        return lines
+
+    def __setitem__(self, filename, lines):
+        self.add(filename, "\n".join(lines))
+
+    def __contains__(self, filename):
+        return filename in self._text or filename in self._files
+
+    def __len__(self):
+        return len(self._text) + len(self._files)
+
+    def pop(self, filename, default=None):
+        # forget filename without reading anything: the lines are returned
+        # only for in-memory sources, a file on disk gives default
+        text = self._text.pop(filename, None)
+        self._files.pop(filename, None)
+        return default if text is None else text.splitlines()
+
+
+def remember_source(source_map, filename, code):
+    if isinstance(source_map, SourceMap):
+        source_map.add(filename, code)
+    else:
+        source_map[filename] = code.splitlines()
+
+
+SOURCE_MAP = SourceMap()
+
+# token spec: one alternation scanned in a single pass over the raw source.
+# Comments are matched here instead of being stripped beforehand; keywords
+# are ordinary IDENT matches looked up in KEYWORDS. The unterminated block
+# comment alternative stops one character short of the end of the source,
+# as the old comment stripper did.
 TOKEN_SPEC = [
+    ("NEWLINE", r"\n"),
+    ("SKIP", r"[ \t\r]+"),
+    ("IDENT", r"[A-Za-z_][A-Za-z0-9_]*"),
+    ("LINE_COMMENT", r"//[^\n]*"),
+    ("BLOCK_COMMENT", r"/\*[\s\S]*?\*/|/\*(?:[\s\S]*(?=[\s\S]\Z))?"),
     ("FLOAT", r"\d+\.\d+"),
     ("NUMBER", r"\d+"),
-    ("EQ", r"=="),
-    ("NE", r"!="),
-    ("LE", r"<="),
-    ("GE", r">="),
-    ("ANDAND", r"&&"),
-    ("OROR", r"\|\|"),
-    ("LT", r"<"),
-    ("GT", r">"),
-    ("PLUS", r"\+"),
-    ("MINUS", r"-"),
-    ("STAR", r"\*"),
-    ("SLASH", r"/"),
-    ("MOD", r"%"),
-    ("BANG", r"!"),
-    ("ASSIGN", r"="),
-    ("SEMICOLON", r";"),
-    ("COMMA", r","),
-    ("COLON", r":"),
-    ("LPAREN", r"\("),
-    ("RPAREN", r"\)"),
-    ("LBRACE", r"\{"),
-    ("RBRACE", r"\}"),
-    ("LBRACK", r"\["),
-    ("RBRACK", r"\]"),
-    ("DOT", r"\."),
     ("STRING", r'"(?:\\.|[^"\\])*"'),
-    ("FROM", r"\bfrom\b"),
-    ("IMPORT", r"\bimport\b"),
-    ("AS", r"\bas\b"),
-    ("FUNC", r"\bfunc\b"),
-    ("RETURN", r"\breturn\b"),
-    ("ELIF", r"\belif\b"),
-    ("IF", r"\bif\b"),
-    ("ELSE", r"\belse\b"),
-    ("WHILE", r"\bwhile\b"),
-    ("PRINT", r"\bprint\b"),
-    ("LET", r"\blet\b"),
-    ("TRUE", r"\b(True|true)\b"),
-    ("FALSE", r"\b(False|false)\b"),
-    ("AND", r"\band\b"),
-    ("OR", r"\bor\b"),
-    ("NOT", r"\bnot\b"),
-    ("IDENT", r"[A-Za-z_][A-Za-z0-9_]*"),
-    ("NEWLINE", r"\n"),
-    ("SKIP", r"[ \t\r]+"),
+    ("OP", r"==|!=|<=|>=|&&|\|\||[<>+\-*/%!]"),
+    ("PUNCT", r"[=;,:(){}\[\]]"),
+    ("DOT", r"\."),
     ("MISMATCH", r"."),
 ]
 
 MASTER_RE = re.compile("|".join(f"(?P<{name}>{pat})" for name, pat in TOKEN_SPEC))
 
+# identifier text -> (token type, value)
+KEYWORDS = {
+    "from": ("FROM", "from"),
+    "import": ("IMPORT", "import"),
+    "as": ("AS", "as"),
+    "func": ("FUNC", "func"),
+    "return": ("RETURN", "return"),
+    "elif": ("ELIF", "elif"),
+    "if": ("IF", "if"),
+    "else": ("ELSE", "else"),
+    "while": ("WHILE", "while"),
+    "print": ("PRINT", "print"),
+    "let": ("LET", "let"),
+    "True": ("TRUE", True),
+    "true": ("TRUE", True),
+    "False": ("FALSE", False),
+    "false": ("FALSE", False),
+    "and": ("OP", "&&"),
+    "or": ("OP", "||"),
+    "not": ("OP", "!"),
+}
+
+PUNCT_TYPES = {
+    "=": "ASSIGN",
+    ";": "SEMICOLON",
+    ",": "COMMA",
+    ":": "COLON",
+    "(": "LPAREN",
+    ")": "RPAREN",
+    "{": "LBRACE",
+    "}": "RBRACE",
+    "[": "LBRACK",
+    "]": "RBRACK",
+}
+
 
 class Token:
+    # no per-instance __dict__: big scripts produce millions of tokens
+    __slots__ = ("type", "value", "lineno", "col", "filename")
+
     def __init__(self, type_, value=None, lineno=None, col=None, filename=None):
         self.type = type_
         self.value = value
@@ -70,158 +148,211 @@ class Token:
         return f"Token({self.type}, {self.value}, {self.filename}:{self.lineno}:{self.col})"
 
 
-# tokenize function identical to v0.7 implementation (use the corrected version previously provided)
-def tokenize(code, filename="<input>"):
-    # store original source lines (use raw code so reported line numbers match file)
-    SOURCE_MAP[filename] = code.splitlines()
-
-    def strip_comments(code):
-        result = []
-        i = 0
-        n = len(code)
-        in_string = False
-        string_char = None
-        while i < n:
-            ch = code[i]
-            if in_string:
-                if ch == "\\" and i + 1 < n:
-                    result.append(code[i])
-                    result.append(code[i + 1])
-                    i += 2
-                    continue
-                elif ch == string_char:
-                    in_string = False
-                    string_char = None
-                    result.append(ch)
-                    i += 1
-                    continue
+def tokenize(code, filename="<input>", source_map=None, keep_source=True):
+    # store original source (use raw code so reported line numbers match file);
+    # an Interpreter passes its own map, plain callers share SOURCE_MAP.
+    # keep_source=False: the caller registers an on-disk file itself
+    if source_map is None:
+        source_map = SOURCE_MAP
+    if keep_source:
+        remember_source(source_map, filename, code)
+    return list(_iter_tokens(code, filename))
+
+
+def tokenize_file(path, filename=None, source_map=None, chunk_size=1 << 16):
+    """
+    Yield the tokens of a source file while reading it in chunks, so neither
+    the whole text nor the whole token list is held in memory. Same tokens
+    as tokenize(open(path).read(), filename).
+    """
+    if filename is None:
+        filename = path
+    if source_map is None:
+        source_map = SOURCE_MAP
+    if isinstance(source_map, SourceMap):
+        source_map.add_file(path)
+    lexer = Lexer(filename)
+    with open(path, "r", encoding="utf-8") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield from lexer.feed(chunk)
+    yield from lexer.finish()
+
+
+def _iter_tokens(code, filename):
+    lexer = Lexer(filename)
+    lexer._buf = code
+    return lexer._scan(final=True)
+
+
+# sources smaller than this are not worth shipping to other processes
+PARALLEL_MIN_SIZE = 1 << 20
+
+# just enough of MASTER_RE to find newlines outside strings and comments,
+# and the brackets around them
+_SPLIT_RE = re.compile(r'"(?:\\.|[^"\\])*"|//[^\n]*|/\*[\s\S]*?\*/|/\*[\s\S]*|[\n(){}\[\]]')
+
+
+def split_points(code, parts):
+    """
+    Offsets that cut code into about `parts` pieces of similar size, each
+    just after a newline outside any string, comment or bracket. Such a
+    newline always ends a top-level statement (or is a syntax error), so
+    every piece holds whole statements and can be tokenized and parsed on
+    its own starting at column 1.
+    """
+    step = len(code) // parts if parts > 1 else 0
+    points = []
+    if not step:
+        return points
+    target = step
+    depth = 0
+    for m in _SPLIT_RE.finditer(code):
+        c = code[m.start()]
+        if c == "\n":
+            if depth == 0 and m.start() >= target:
+                points.append(m.end())
+                if len(points) == parts - 1:
+                    break
+                target = m.end() + step
+        elif c in "({[":
+            depth += 1
+        elif c in ")}]":
+            depth -= 1
+    return points
+
+
+class Lexer:
+    """
+    Incremental tokenizer: feed() the source in pieces of any size and get
+    back the tokens that are already certain; finish() flushes the rest. A
+    token that could still grow with more input (a name or number at the end
+    of the buffer, an unterminated string or block comment) is held back.
+    """
+
+    def __init__(self, filename="<input>"):
+        # every token shares one interned filename string
+        self.filename = sys.intern(filename)
+        self.lineno = 1
+        self.col = 1
+        self._buf = ""
+        self._pos = 0
+        # the held-back input starts an unterminated string or block comment
+        self.in_literal = False
+
+    def feed(self, text):
+        if self._pos > 1:
+            # keep one consumed character: keywords check what precedes them
+            self._buf = self._buf[self._pos - 1 :]
+            self._pos = 1
+        self._buf += text
+        return list(self._scan(final=False))
+
+    def finish(self):
+        return list(self._scan(final=True))
+
+    def flush(self):
+        """
+        Like finish(), but more input may still follow, e.g. at the end of a
+        REPL line. Returns None, consuming nothing, if the input so far ends
+        inside a string or block comment.
+        """
+        if self.in_literal:
+            return None
+        return list(self._scan(final=True))
+
+    def pending(self):
+        # input fed but not tokenized yet (held back by feed() or flush())
+        return self._buf[self._pos :]
+
+    def _scan(self, final):
+        # columns count only the characters of tokens and whitespace, not of
+        # comments, and a block comment yields one NEWLINE per newline inside it
+        # (positions match the v0.7 lexer, which stripped comments first)
+        code = self._buf
+        filename = self.filename
+        lineno = self.lineno
+        col = self.col
+        keywords = KEYWORDS
+        # without more input, a match reaching this far may still change
+        limit = len(code) if final else len(code) - 1
+        stop = len(code)
+        for m in MASTER_RE.finditer(code, self._pos):
+            kind = m.lastgroup
+            text = m.group()
+            if not final and (
+                m.end() >= limit
+                or (kind == "MISMATCH" and text == '"')
+                or (kind == "BLOCK_COMMENT" and not (len(text) >= 4 and text.endswith("*/")))
+            ):
+                stop = m.start()
+                self.in_literal = (kind == "MISMATCH" and text == '"') or (
+                    kind == "BLOCK_COMMENT" and not (len(text) >= 4 and text.endswith("*/"))
+                )
+                break
+
+            if kind == "SKIP":
+                col += len(text)
+            elif kind == "IDENT":
+                kw = keywords.get(text)
+                if kw is not None:
+                    start, end = m.span()
+                    # a keyword glued to a preceding number ("1if") or followed by
+                    # a non-ASCII word character stays an identifier
+                    if (start and code[start - 1].isalnum()) or (
+                        end < len(code) and code[end].isalnum()
+                    ):
+                        kw = None
+                if kw is None:
+                    yield Token("IDENT", text, lineno, col, filename)
+                else:
+                    yield Token(kw[0], kw[1], lineno, col, filename)
+                col += len(text)
+            elif kind == "NEWLINE":
+                yield Token("NEWLINE", text, lineno, col, filename)
+                lineno += 1
+                col = 1
+            elif kind == "OP":
+                yield Token("OP", text, lineno, col, filename)
+                col += len(text)
+            elif kind == "PUNCT":
+                yield Token(PUNCT_TYPES[text], text, lineno, col, filename)
+                col += 1
+            elif kind == "NUMBER":
+                yield Token("NUMBER", int(text), lineno, col, filename)
+                col += len(text)
+            elif kind == "STRING":
+                inner = text[1:-1]
+                if "\\" in inner or not inner.isascii():
+                    inner = bytes(inner, "utf-8").decode("unicode_escape")
+                yield Token("STRING", inner, lineno, col, filename)
+                newlines = text.count("\n")
+                if newlines:
+                    lineno += newlines
+                    col = len(text) - text.rfind("\n")
                 else:
-                    result.append(ch)
-                    i += 1
-                    continue
+                    col += len(text)
+            elif kind == "DOT":
+                yield Token("DOT", text, lineno, col, filename)
+                col += 1
+            elif kind == "FLOAT":
+                yield Token("NUMBER", float(text), lineno, col, filename)
+                col += len(text)
+            elif kind == "LINE_COMMENT":
+                continue
+            elif kind == "BLOCK_COMMENT":
+                for _ in range(text.count("\n")):
+                    yield Token("NEWLINE", "\n", lineno, col, filename)
+                    lineno += 1
+                    col = 1
             else:
-                if ch == '"' or ch == "'":
-                    in_string = True
-                    string_char = ch
-                    result.append(ch)
-                    i += 1
-                    continue
-                if ch == "/" and i + 1 < n and code[i + 1] == "/":
-                    i += 2
-                    while i < n and code[i] != "\n":
-                        i += 1
-                    continue
-                if ch == "/" and i + 1 < n and code[i + 1] == "*":
-                    start = i
-                    i += 2
-                    while i + 1 < n and not (code[i] == "*" and code[i + 1] == "/"):
-                        i += 1
-                    end = i + 2 if i + 1 < n else i
-                    comment_text = code[start:end]
-                    newline_count = comment_text.count("\n")
-                    result.append("\n" * newline_count)
-                    i = end
-                    continue
-                result.append(ch)
-                i += 1
-        return "".join(result)
-
-    cleaned = strip_comments(code)
-    tokens = []
-    lineno = 1
-    col = 1
-    for m in MASTER_RE.finditer(cleaned):
-        kind = m.lastgroup
-        text = m.group()
-        token_lineno = lineno
-        token_col = col
-
-        if kind == "NEWLINE":
-            tokens.append(Token("NEWLINE", text, token_lineno, token_col, filename))
-            lineno += 1
-            col = 1
-            continue
-
-        newlines = text.count("\n")
-        if newlines:
-            last_nl = text.rfind("\n")
-            lineno += newlines
-            col = len(text) - last_nl
-        else:
-            col += len(text)
-
-        if kind == "FLOAT":
-            tokens.append(
-                Token("NUMBER", float(text), token_lineno, token_col, filename)
-            )
-        elif kind == "NUMBER":
-            tokens.append(Token("NUMBER", int(text), token_lineno, token_col, filename))
-        elif kind == "STRING":
-            inner = text[1:-1]
-            inner = bytes(inner, "utf-8").decode("unicode_escape")
-            tokens.append(Token("STRING", inner, token_lineno, token_col, filename))
-        elif kind in (
-            "EQ",
-            "NE",
-            "LE",
-            "GE",
-            "LT",
-            "GT",
-            "PLUS",
-            "MINUS",
-            "STAR",
-            "SLASH",
-            "MOD",
-            "BANG",
-        ):
-            tokens.append(Token("OP", text, token_lineno, token_col, filename))
-        elif kind in ("ANDAND", "OROR"):
-            tokens.append(Token("OP", text, token_lineno, token_col, filename))
-        elif kind in ("AND", "OR", "NOT"):
-            canonical = {"AND": "&&", "OR": "||", "NOT": "!"}[kind]
-            tokens.append(Token("OP", canonical, token_lineno, token_col, filename))
-        elif kind == "DOT":
-            tokens.append(Token("DOT", text, token_lineno, token_col, filename))
-        elif kind in (
-            "ASSIGN",
-            "SEMICOLON",
-            "COMMA",
-            "COLON",
-            "LPAREN",
-            "RPAREN",
-            "LBRACE",
-            "RBRACE",
-            "LBRACK",
-            "RBRACK",
-        ):
-            tokens.append(Token(kind, text, token_lineno, token_col, filename))
-        elif kind in (
-            "FROM",
-            "IMPORT",
-            "AS",
-            "FUNC",
-            "RETURN",
-            "ELIF",
-            "IF",
-            "ELSE",
-            "WHILE",
-            "PRINT",
-            "LET",
-        ):
-            tokens.append(Token(kind, text, token_lineno, token_col, filename))
-        elif kind in ("TRUE", "FALSE"):
-            val = True if text.lower() == "true" else False
-            tokens.append(
-                Token(
-                    "TRUE" if val else "FALSE", val, token_lineno, token_col, filename
+                raise Exception(
+                    f"Unexpected character {text} at {filename}:{lineno}:{col}"
                 )
-            )
-        elif kind == "IDENT":
-            tokens.append(Token("IDENT", text, token_lineno, token_col, filename))
-        elif kind == "SKIP":
-            continue
-        elif kind == "MISMATCH":
-            raise Exception(
-                f"Unexpected character {text} at {filename}:{token_lineno}:{token_col}"
-            )
-    return tokens
+        if stop == len(code):
+            self.in_literal = False
+        self._pos = stop
+        self.lineno = lineno
+        self.col = col
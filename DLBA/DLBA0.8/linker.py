@@ -0,0 +1,249 @@
+# linker.py - static linker and tree shaker for multi-module programs (v0.8)
+import argparse
+import os
+import pickle
+from collections import deque
+
+from ast_nodes import *
+from interpreter import _resolve_module_path, parse_file
+
+# linked artifacts start with this header, followed by a pickled dict:
+#   {"entry": key, "modules": {key: [statements]}}
+# keys are module paths relative to the entry's directory
+LINK_MAGIC = b"DLBALNK1"
+
+
+def _children(node):
+    """Direct child nodes of an AST node (statements and expressions)."""
+    if isinstance(node, (Assign, Print)):
+        return [node.expr]
+    if isinstance(node, Return):
+        return [node.expr] if node.expr is not None else []
+    if isinstance(node, If):
+        out = [node.condition] + list(node.then_branch)
+        for econd, ebranch in node.elif_branches:
+            out.append(econd)
+            out.extend(ebranch)
+        if node.else_branch:
+            out.extend(node.else_branch)
+        return out
+    if isinstance(node, While):
+        return [node.condition] + list(node.body)
+    if isinstance(node, FunctionDef):
+        return list(node.body)
+    if isinstance(node, Call):
+        return [node.callee] + list(node.args)
+    if isinstance(node, ModuleAccess):
+        return [node.obj]
+    if isinstance(node, BinOp):
+        return [node.left, node.right]
+    if isinstance(node, UnaryOp):
+        return [node.operand]
+    if isinstance(node, ListLiteral):
+        return list(node.elements)
+    if isinstance(node, DictLiteral):
+        out = []
+        for k, v in node.pairs:
+            out.append(k)
+            out.append(v)
+        return out
+    if isinstance(node, Index):
+        return [node.target, node.index_expr]
+    if isinstance(node, Slice):
+        return [n for n in (node.start, node.stop) if n is not None]
+    return []
+
+
+def _walk(nodes):
+    stack = list(nodes)
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(_children(node))
+
+
+def _has_call(node):
+    return any(isinstance(n, Call) for n in _walk([node]))
+
+
+class _Module:
+    def __init__(self, key, abs_path, stmts, filename=None):
+        self.key = key
+        self.abs_path = abs_path
+        self.filename = filename or abs_path  # name the source was parsed under
+        self.stmts = stmts
+        self.keep_all = False
+        self.kept = set()  # indexes into stmts
+        self.needed = set()  # names looked up in this module
+        self.member_refs = {}  # name -> members used as name.member
+        self.bindings = {}  # top-level name -> statement indexes
+        for i, stmt in enumerate(stmts):
+            if isinstance(stmt, (Assign, FunctionDef)):
+                self.bindings.setdefault(stmt.name, []).append(i)
+        # import edges discovered in kept code
+        self.wildcards = []
+        self.from_names = {}  # name -> modules
+        self.aliases = {}  # alias -> modules
+
+
+class Linker:
+    """
+    Load an entry file and every module it imports, then keep only the
+    top-level bindings of imported modules that are reachable from the
+    entry program. Module statements with side effects are always kept,
+    and a module whose alias escapes as a plain value is kept whole.
+    With shake=False every loaded module is kept whole.
+    """
+
+    def __init__(self, entry_path, shake=True):
+        self.entry_path = entry_path
+        self.shake = shake
+        self.base_dir = os.path.dirname(os.path.abspath(entry_path))
+        self.modules = {}  # abs_path -> _Module
+        self.pending = deque()
+
+    def _key(self, abs_path):
+        return os.path.relpath(abs_path, self.base_dir).replace(os.sep, "/")
+
+    def link(self):
+        abs_entry = os.path.abspath(self.entry_path)
+        entry = _Module(
+            self._key(abs_entry),
+            abs_entry,
+            parse_file(self.entry_path),
+            filename=self.entry_path,
+        )
+        self.modules[abs_entry] = entry
+        self.pending.append(("all", entry))
+        while self.pending:
+            event = self.pending.popleft()
+            getattr(self, "_on_" + event[0])(*event[1:])
+        return self._artifact(entry)
+
+    # -- events --
+    def _on_all(self, mod):
+        if not mod.keep_all:
+            mod.keep_all = True
+            self._keep(mod, range(len(mod.stmts)))
+
+    def _on_effects(self, mod):
+        # statements that run for their side effects are kept on first load
+        for i, stmt in enumerate(mod.stmts):
+            if isinstance(stmt, FunctionDef):
+                continue
+            if isinstance(stmt, Assign):
+                if _has_call(stmt.expr):
+                    self.pending.append(("name", mod, stmt.name))
+                continue
+            self._keep(mod, [i])
+
+    def _on_name(self, mod, name):
+        if name in mod.needed:
+            return
+        mod.needed.add(name)
+        self._keep(mod, mod.bindings.get(name, []))
+        for target in mod.from_names.get(name, []) + mod.wildcards:
+            self.pending.append(("name", target, name))
+        for target in mod.aliases.get(name, []):
+            self.pending.append(("all", target))
+
+    def _on_member(self, mod, name, member):
+        members = mod.member_refs.setdefault(name, set())
+        if member in members:
+            return
+        members.add(member)
+        self._keep(mod, mod.bindings.get(name, []))
+        for target in mod.from_names.get(name, []):
+            self.pending.append(("name", target, name))
+        for target in mod.wildcards:
+            self.pending.append(("member", target, name, member))
+        for target in mod.aliases.get(name, []):
+            # alias.member only needs that member of the aliased module
+            self.pending.append(("name", target, member))
+
+    # -- helpers --
+    def _keep(self, mod, indexes):
+        for i in indexes:
+            if i not in mod.kept:
+                mod.kept.add(i)
+                self._scan(mod, mod.stmts[i])
+
+    def _scan(self, mod, stmt):
+        member_objs = set()
+        for node in _walk([stmt]):
+            if isinstance(node, Import):
+                self._link_import(mod, node)
+            elif isinstance(node, ModuleAccess) and isinstance(node.obj, Var):
+                member_objs.add(id(node.obj))
+                self.pending.append(("member", mod, node.obj.name, node.member))
+            elif isinstance(node, Var) and id(node) not in member_objs:
+                self.pending.append(("name", mod, node.name))
+
+    def _link_import(self, mod, node):
+        abs_path = _resolve_module_path(node)
+        target = self.modules.get(abs_path)
+        if target is None:
+            if not os.path.isfile(abs_path):
+                raise Exception(
+                    f"Module file not found: {abs_path} at {node.filename}:{node.lineno}:{getattr(node,'col',None)}"
+                )
+            target = _Module(self._key(abs_path), abs_path, parse_file(abs_path))
+            self.modules[abs_path] = target
+            self.pending.append(("effects" if self.shake else "all", target))
+        node.resolved_path = target.key
+        if node.names:
+            for name in node.names:
+                mod.from_names.setdefault(name, []).append(target)
+                # the import itself looks the name up, so it must survive
+                self.pending.append(("name", target, name))
+        elif node.as_name:
+            mod.aliases.setdefault(node.as_name, []).append(target)
+            if node.as_name in mod.needed:
+                self.pending.append(("all", target))
+            for member in mod.member_refs.get(node.as_name, ()):
+                self.pending.append(("name", target, member))
+        else:
+            mod.wildcards.append(target)
+            for name in mod.needed:
+                self.pending.append(("name", target, name))
+            for name, members in mod.member_refs.items():
+                for member in members:
+                    self.pending.append(("member", target, name, member))
+
+    def _artifact(self, entry):
+        modules = {}
+        for mod in self.modules.values():
+            modules[mod.key] = [s for i, s in enumerate(mod.stmts) if i in mod.kept]
+        return {"entry": entry.key, "modules": modules}
+
+
+def link(entry_path):
+    return Linker(entry_path).link()
+
+
+def write_linked(artifact, out_path):
+    with open(out_path, "wb") as f:
+        f.write(LINK_MAGIC)
+        pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_linked(path):
+    # returns the artifact dict, or None if path is not a linked artifact
+    with open(path, "rb") as f:
+        if f.read(len(LINK_MAGIC)) != LINK_MAGIC:
+            return None
+        return pickle.load(f)
+
+
+def main(argv):
+    ap = argparse.ArgumentParser(
+        prog="main.py link", description="Link a DLBA program into one file."
+    )
+    ap.add_argument("entry", help="entry .dlba file")
+    ap.add_argument("-o", "--output", help="output path (default: <entry>.dlbl)")
+    args = ap.parse_args(argv)
+    out = args.output or os.path.splitext(args.entry)[0] + ".dlbl"
+    artifact = link(args.entry)
+    write_linked(artifact, out)
+    kept = sum(len(s) for s in artifact["modules"].values())
+    print(f"linked {len(artifact['modules'])} module(s), {kept} top-level statement(s) -> {out}")
@@ -1,32 +1,130 @@
 # main.py - entrypoint (v0.8)
 import sys
-from parser import Parser
+from parser import StreamParser
 
+from bundle import is_bundle, load_bundle
 from env import Environment
-from interpreter import format_traceback, interpret, register_stdlib
-from lexer import tokenize
+from interpreter import (
+    default_interpreter,
+    format_traceback,
+    install_prelinked,
+    interpret,
+    parse_file,
+    rebind_modules,
+    register_stdlib,
+)
+from lexer import tokenize_file
+from linker import load_linked
 
 
-def run_file(filename):
+def load_program(filename, stream=False):
+    # source file, linked artifact (.dlbl) or bundle (.dlbz) -> entry statements;
+    # stream=True: a source file becomes a generator of statements, each parsed
+    # only when the previous one has run
+    interp = default_interpreter()
+    with interp.phase("load artifact"):
+        linked = load_linked(filename)
+        bundle = None if linked is not None or not is_bundle(filename) else load_bundle(filename)
+    if linked is not None:
+        # pre-linked artifact: every import is already resolved and parsed
+        install_prelinked(linked["modules"])
+        return linked["modules"][linked["entry"]]
+    if bundle is not None:
+        entry, modules = bundle
+        install_prelinked(modules)
+        return modules[entry]
+    if stream:
+        # lexing and parsing then happen during the interpret phase
+        return StreamParser(tokenize_file(filename), optimize=interp.optimize).iter_parse()
+    return parse_file(filename)
+
+
+def run_file(filename, argv=None, snapshot=None, stream=False):
+    phase = default_interpreter().phase
     try:
-        with open(filename, "r", encoding="utf-8") as f:
-            code = f.read()
-        tokens = tokenize(code, filename=filename)
-        parser = Parser(tokens)
-        statements = parser.parse()
-        env = Environment()
-        register_stdlib(env)
+        if snapshot:
+            # pre-initialized image: builtins and preloaded modules are ready
+            from snapshot import load_snapshot
+
+            with phase("load snapshot"):
+                env = load_snapshot(snapshot)
+        else:
+            env = Environment()
+            with phase("register_stdlib"):
+                register_stdlib(env)
+        statements = load_program(filename, stream=stream)
         dlba_mod = env.get("dlba")
-        dlba_mod["argv"] = sys.argv[2:]
-        interpret(statements, env, current_filename=filename)
+        dlba_mod["argv"] = sys.argv[2:] if argv is None else argv
+        # modules cached by an earlier run (server, batch) see this run's dlba
+        rebind_modules(env)
+        with phase("interpret"):
+            interpret(statements, env, current_filename=filename)
     except Exception as e:
         format_traceback(e)
+        return 1
+    return 0
 
 
-if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        run_file(sys.argv[1])
+# build commands: python main.py <command> ... -> <module>.main(args)
+COMMANDS = {"link": "linker", "bundle": "bundle", "snapshot": "snapshot"}
+
+
+def main(argv):
+    if argv and argv[0] in COMMANDS:
+        import importlib
+
+        importlib.import_module(COMMANDS[argv[0]]).main(argv[1:])
+        return
+    snapshot = None
+    serving = False
+    watching = False
+    stream = False
+    sock_path = None
+    while argv and (argv[0].startswith("--") or argv[0] in ("-O", "-OO")):
+        opt = argv.pop(0)
+        if opt in ("-O", "-OO"):
+            # production mode: coarser error locations, smaller ASTs
+            default_interpreter().optimize = len(opt) - 1
+        elif opt == "--snapshot" and argv:
+            snapshot = argv.pop(0)
+        elif opt == "--serve":
+            serving = True
+        elif opt == "--watch":
+            watching = True
+        elif opt == "--stream":
+            stream = True
+        elif opt == "--timings":
+            from timings import Timings
+
+            # per-phase and per-import report on stderr (see timings.py)
+            default_interpreter().timings = Timings()
+        elif opt == "--socket" and argv:
+            sock_path = argv.pop(0)
+        elif opt == "--batch":
+            from batch import main as batch_main
+
+            sys.exit(batch_main(argv))
+        else:
+            print(f"Unknown option {opt}")
+            sys.exit(2)
+    if serving:
+        from server import DEFAULT_SOCKET, serve
+
+        serve(run_file, sock_path or DEFAULT_SOCKET)
+    elif watching and argv:
+        from watch import watch
+
+        sys.exit(watch(run_file, argv[0], argv[1:]))
+    elif argv:
+        status = run_file(argv[0], argv[1:], snapshot=snapshot, stream=stream)
+        if default_interpreter().timings is not None:
+            default_interpreter().timings.report()
+        sys.exit(status)
     else:
         from repl import repl
 
         repl()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
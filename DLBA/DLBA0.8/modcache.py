@@ -0,0 +1,121 @@
+# modcache.py - bounded LRU cache of loaded module environments (v0.8)
+import sys
+import weakref
+from collections import OrderedDict
+
+
+def estimate_size(env):
+    # rough footprint of a module namespace: its dict plus every str/number/
+    # list/dict reachable from it (functions and other modules not followed)
+    total = sys.getsizeof(env.vars)
+    seen = set()
+    stack = list(env.vars.keys()) + list(env.vars.values())
+    while stack:
+        value = stack.pop()
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+        total += sys.getsizeof(value)
+        if isinstance(value, dict):
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple, set)):
+            stack.extend(value)
+    return total
+
+
+class ModuleCache:
+    """
+    abs_path -> module Environment, least recently imported evicted first once
+    max_entries or max_bytes (estimated, see estimate_size) is exceeded; None
+    means unlimited. A module is pinned while anything registered with pin()
+    (the ModuleValue of `import ... as`, or an environment it is wildcard-
+    linked into or that from-imported names from it) is alive: evicting it
+    would let a later import create a second copy with separate state. If
+    only pinned modules are left, the cache stays over its limit until they
+    are released. on_evict(path) is called for every
+    module dropped by eviction (not by pop() or clear()).
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None, on_evict=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self._envs = OrderedDict()
+        self._sizes = {}
+        self._pins = {}  # path -> WeakSet of holders
+        self.total_bytes = 0
+
+    def __contains__(self, path):
+        return path in self._envs
+
+    def __getitem__(self, path):
+        env = self._envs[path]
+        self._envs.move_to_end(path)
+        return env
+
+    def __setitem__(self, path, env):
+        self.put(path, env)
+
+    def __len__(self):
+        return len(self._envs)
+
+    def __iter__(self):
+        return iter(list(self._envs))
+
+    def keys(self):
+        return list(self._envs)
+
+    def items(self):
+        return list(self._envs.items())
+
+    def update(self, modules):
+        for path, env in modules.items():
+            self.put(path, env)
+
+    def put(self, path, env):
+        if path in self._envs:
+            self.total_bytes -= self._sizes[path]
+        self._envs[path] = env
+        self._envs.move_to_end(path)
+        size = estimate_size(env) if self.max_bytes is not None else 0
+        self._sizes[path] = size
+        self.total_bytes += size
+        self._evict(keep=path)
+
+    def pin(self, path, holder):
+        self._pins.setdefault(path, weakref.WeakSet()).add(holder)
+
+    def pinned(self, path):
+        holders = self._pins.get(path)
+        return bool(holders)
+
+    def pop(self, path, default=None):
+        if path not in self._envs:
+            return default
+        env = self._envs.pop(path)
+        self.total_bytes -= self._sizes.pop(path)
+        self._pins.pop(path, None)
+        return env
+
+    def clear(self):
+        for path in list(self._envs):
+            self.pop(path)
+
+    def _over_limit(self):
+        if self.max_entries is not None and len(self._envs) > self.max_entries:
+            return True
+        return self.max_bytes is not None and self.total_bytes > self.max_bytes
+
+    def _evict(self, keep=None):
+        while self._over_limit():
+            victim = None
+            for path in self._envs:
+                if path != keep and not self.pinned(path):
+                    victim = path
+                    break
+            if victim is None:
+                return
+            self.pop(victim)
+            if self.on_evict:
+                self.on_evict(victim)
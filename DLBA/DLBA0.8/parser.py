@@ -1,17 +1,74 @@
 # parser.py - DLBA parser (v0.8)
+import io
+import os
+import pickle
+import sys
+from collections import deque
+from itertools import islice
+
 from ast_nodes import *
+from lexer import PARALLEL_MIN_SIZE, SOURCE_MAP, Lexer, remember_source, split_points
+
+# binary operator -> binding power, highest binds tightest (GRAMMAR.md section 4)
+BINARY_PRECEDENCE = {
+    "||": 1,
+    "&&": 2,
+    "==": 3,
+    "!=": 3,
+    "<": 4,
+    ">": 4,
+    "<=": 4,
+    ">=": 4,
+    "+": 5,
+    "-": 5,
+    "*": 6,
+    "/": 6,
+    "%": 6,
+}
+UNARY_OPS = ("!", "-")
+# constant literals nested deeper than this are parsed the normal way
+# (marshal, which Constant nodes are stored with, has a nesting limit)
+MAX_CONSTANT_DEPTH = 1000
+# a StreamParser keeps at most this many tokens of a statement for re-parsing
+# it (see StreamParser); longer statements go to the explicit-stack methods
+REPARSE_BUFFER = 1 << 16
+
+
+class _ParseAgain(Exception):
+    # a statement outgrew REPARSE_BUFFER: parse it with the explicit stack
+    pass
+
+
+def _headroom(n):
+    # raises RecursionError unless n more Python frames fit on the stack
+    if n:
+        _headroom(n - 1)
 
 
 class Parser:
-    def __init__(self, tokens):
+    def __init__(self, tokens, deep=False, optimize=0):
         self.tokens = tokens
         self.pos = 0
+        # deep=True: always use the explicit-stack methods (see _trampoline)
+        self.deep = deep
+        # optimize=1 (-O): nodes keep only their filename, except function
+        # definitions (the line table tracebacks fall back to) and imports;
+        # optimize=2 (-OO): function definitions keep no line either
+        self.optimize = optimize
+        # positions of [ / { already found not to be constant literals
+        self._not_constant = set()
 
     def peek(self):
-        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+        try:
+            return self.tokens[self.pos]
+        except IndexError:
+            return None
 
     def peek_next(self):
-        return self.tokens[self.pos + 1] if (self.pos + 1) < len(self.tokens) else None
+        try:
+            return self.tokens[self.pos + 1]
+        except IndexError:
+            return None
 
     def eat(self, expected_type=None):
         tok = self.peek()
@@ -24,6 +81,12 @@ class Parser:
         self.pos += 1
         return tok
 
+    def _locate(self, node, tok):
+        if self.optimize:
+            node.set_pos(None, tok.filename)
+        else:
+            node.set_pos(tok.lineno, tok.filename, tok.col)
+
     def _skip_newlines(self):
         while self.peek() and self.peek().type == "NEWLINE":
             self.eat("NEWLINE")
@@ -55,15 +118,131 @@ class Parser:
         return stmts
 
     def parse(self):
-        statements = []
+        return list(self.iter_parse())
+
+    def iter_parse(self):
+        # yield each top-level statement as soon as it is complete
         while self.peek():
             self._skip_newlines()
             if not self.peek():
                 break
-            stmt = self.statement()
+            # literal positions already known not to be constant: this
+            # statement's only
+            self._not_constant.clear()
+            mark = self._mark()
+            if self.deep:
+                stmt = self._trampoline(self._g_statement())
+            else:
+                try:
+                    stmt = self.statement()
+                except (RecursionError, _ParseAgain):
+                    # nested too deeply for the Python stack: parse this
+                    # statement again with the explicit-stack methods
+                    self._rewind(mark)
+                    stmt = self._trampoline(self._g_statement())
             self._consume_terminator_or_validate()
-            statements.append(stmt)
-        return statements
+            yield stmt
+
+    def _mark(self):
+        return self.pos
+
+    def _rewind(self, mark):
+        self.pos = mark
+
+    def _peek_at(self, k):
+        try:
+            return self.tokens[self.pos + k]
+        except IndexError:
+            return None
+
+    def _advance(self, k):
+        self.pos += k
+
+    def _constant_literal(self):
+        # fast path for data literals: if the [ or { at the current position
+        # holds only numbers (optionally negated), strings, booleans and
+        # nested such literals, build the Python value in a single iterative
+        # scan and return it as a Constant. Otherwise return None without
+        # consuming anything, and the literal is parsed the normal way.
+        start = self.pos
+        if start in self._not_constant:
+            return None
+        peek_at = self._peek_at
+        lb = peek_at(0)
+        k = 0
+        stack = []  # [container, pending dict key, position of its bracket]
+        while True:
+            tok = peek_at(k)
+            if tok is None:
+                break
+            t = tok.type
+            complete = True
+            if t == "NUMBER" or t == "STRING" or t == "TRUE" or t == "FALSE":
+                value = tok.value
+                k += 1
+            elif t == "OP" and tok.value == "-":
+                num = peek_at(k + 1)
+                if num is None or num.type != "NUMBER":
+                    break
+                value = -num.value
+                k += 2
+            elif t == "LBRACK" or t == "LBRACE":
+                value = [] if t == "LBRACK" else {}
+                nxt = peek_at(k + 1)
+                if nxt is not None and nxt.type == ("RBRACK" if t == "LBRACK" else "RBRACE"):
+                    k += 2
+                elif len(stack) < MAX_CONSTANT_DEPTH:
+                    stack.append([value, None, start + k])
+                    k += 1
+                    complete = False
+                else:
+                    break
+            else:
+                break
+            # a value is complete: store it, then eat commas and closing
+            # brackets until the next value starts
+            while complete:
+                if not stack:
+                    self._advance(k)
+                    node = Constant(value)
+                    self._locate(node, lb)
+                    return node
+                top = stack[-1]
+                container = top[0]
+                if top[1] is None:
+                    container.append(value)
+                    close = "RBRACK"
+                else:
+                    container[top[1]] = value
+                    close = "RBRACE"
+                sep = peek_at(k)
+                if sep is None:
+                    break
+                if sep.type == close:
+                    stack.pop()
+                    value = container
+                    k += 1
+                elif sep.type == "COMMA":
+                    k += 1
+                    complete = False
+                else:
+                    break
+            if complete:
+                break
+            top = stack[-1]
+            if isinstance(top[0], dict):
+                key, colon = peek_at(k), peek_at(k + 1)
+                if key is None or key.type not in ("STRING", "IDENT"):
+                    break
+                if colon is None or colon.type != "COLON":
+                    break
+                top[1] = key.value
+                k += 2
+        # every literal still open contains the offending token, so none of
+        # them needs to be scanned again when the normal path reaches it
+        self._not_constant.add(start)
+        self._not_constant.update(entry[2] for entry in stack)
+        return None
 
     # statement parsing (same as v0.7) ...
     # (omitted here for brevity — use the full statement implementation from v0.7)
@@ -87,8 +266,7 @@ class Parser:
                 self.eat("COMMA")
                 names.append(self.eat("IDENT").value)
             node = Import(path_tok.value, as_name=None, names=names)
-            node.lineno = path_tok.lineno
-            node.filename = path_tok.filename
+            node.set_pos(path_tok.lineno, path_tok.filename)
             return node
 
         # import "path" [as alias]
@@ -101,8 +279,7 @@ class Parser:
                 name_tok = self.eat("IDENT")
                 as_name = name_tok.value
             node = Import(path_tok.value, as_name=as_name, names=None)
-            node.lineno = path_tok.lineno
-            node.filename = path_tok.filename
+            node.set_pos(path_tok.lineno, path_tok.filename)
             return node
 
         # let decl
@@ -112,8 +289,6 @@ class Parser:
             self.eat("ASSIGN")
             expr = self.expr()
             node = Assign(name_tok.value, expr, declare=True)
-            node.lineno = getattr(expr, "lineno", let_tok.lineno)
-            node.filename = getattr(expr, "filename", let_tok.filename)
             return node
 
         # func def
@@ -132,8 +307,7 @@ class Parser:
             body = self._parse_block_statements()
             self.eat("RBRACE")
             node = FunctionDef(name, params, body)
-            node.lineno = func_tok.lineno
-            node.filename = func_tok.filename
+            node.set_pos(func_tok.lineno if self.optimize < 2 else None, func_tok.filename)
             return node
 
         # assignment without let
@@ -146,8 +320,6 @@ class Parser:
             self.eat("ASSIGN")
             expr = self.expr()
             node = Assign(name_tok.value, expr, declare=False)
-            node.lineno = getattr(expr, "lineno", name_tok.lineno)
-            node.filename = getattr(expr, "filename", name_tok.filename)
             return node
 
         # print
@@ -160,8 +332,6 @@ class Parser:
             else:
                 expr = self.expr()
             node = Print(expr)
-            node.lineno = getattr(expr, "lineno", p_tok.lineno)
-            node.filename = getattr(expr, "filename", p_tok.filename)
             return node
 
         # return
@@ -175,12 +345,8 @@ class Parser:
             ):
                 expr = self.expr()
             node = Return(expr)
-            node.lineno = (
-                getattr(expr, "lineno", r_tok.lineno) if expr else r_tok.lineno
-            )
-            node.filename = (
-                getattr(expr, "filename", r_tok.filename) if expr else r_tok.filename
-            )
+            if expr is None:
+                node.set_pos(None if self.optimize else r_tok.lineno, r_tok.filename)
             return node
 
         # if / while
@@ -226,8 +392,6 @@ class Parser:
             self.eat("RBRACE")
 
         node = If(condition, then_branch, elif_branches, else_branch)
-        node.lineno = getattr(condition, "lineno", if_tok.lineno)
-        node.filename = getattr(condition, "filename", if_tok.filename)
         return node
 
     def while_statement(self):
@@ -239,93 +403,28 @@ class Parser:
         body = self._parse_block_statements()
         self.eat("RBRACE")
         node = While(condition, body)
-        node.lineno = getattr(condition, "lineno", w_tok.lineno)
-        node.filename = getattr(condition, "filename", w_tok.filename)
         return node
 
     # --- Expressions ---
-    def expr(self):
-        return self.or_expr()
-
-    def or_expr(self):
-        node = self.and_expr()
-        while self.peek() and self.peek().type == "OP" and self.peek().value in ("||",):
-            op_tok = self.eat("OP")
-            right = self.and_expr()
-            node = BinOp(node, op_tok.value, right)
-            node.lineno = op_tok.lineno
-            node.filename = op_tok.filename
-            node.col = op_tok.col
-        return node
-
-    def and_expr(self):
-        node = self.equality()
-        while self.peek() and self.peek().type == "OP" and self.peek().value in ("&&",):
-            op_tok = self.eat("OP")
-            right = self.equality()
-            node = BinOp(node, op_tok.value, right)
-            node.lineno = op_tok.lineno
-            node.filename = op_tok.filename
-            node.col = op_tok.col
-        return node
-
-    def equality(self):
-        node = self.comparison()
-        while (
-            self.peek()
-            and self.peek().type == "OP"
-            and self.peek().value in ("==", "!=")
-        ):
-            op_tok = self.eat("OP")
-            right = self.comparison()
-            node = BinOp(node, op_tok.value, right)
-            node.lineno = op_tok.lineno
-            node.filename = op_tok.filename
-            node.col = op_tok.col
-        return node
-
-    def comparison(self):
-        node = self.additive()
-        while (
-            self.peek()
-            and self.peek().type == "OP"
-            and self.peek().value in ("<", ">", "<=", ">=")
-        ):
-            op_tok = self.eat("OP")
-            right = self.additive()
-            node = BinOp(node, op_tok.value, right)
-            node.lineno = op_tok.lineno
-            node.filename = op_tok.filename
-            node.col = op_tok.col
-        return node
-
-    def additive(self):
-        node = self.term()
-        while (
-            self.peek() and self.peek().type == "OP" and self.peek().value in ("+", "-")
-        ):
-            op_tok = self.eat("OP")
-            right = self.term()
-            node = BinOp(node, op_tok.value, right)
-            node.lineno = op_tok.lineno
-            node.filename = op_tok.filename
-            node.col = op_tok.col
-        return node
-
-    def term(self):
-        node = self.factor()
-        while (
-            self.peek()
-            and self.peek().type == "OP"
-            and self.peek().value in ("*", "/", "%")
-        ):
+    def expr(self, min_prec=1):
+        # precedence climbing: a unary/postfix operand, then every binary
+        # operator binding at least as tightly as min_prec (all left-assoc)
+        tok = self.peek()
+        if tok and tok.type == "OP" and tok.value in UNARY_OPS:
+            node = self.factor()
+        else:
+            node = self.postfix()
+        while True:
+            tok = self.peek()
+            if not tok or tok.type != "OP":
+                return node
+            prec = BINARY_PRECEDENCE.get(tok.value)
+            if prec is None or prec < min_prec:
+                return node
             op_tok = self.eat("OP")
-            right = self.factor()
+            right = self.expr(prec + 1)
             node = BinOp(node, op_tok.value, right)
-            node.lineno = op_tok.lineno
-            node.filename = op_tok.filename
-            node.col = op_tok.col
-        return node
+            self._locate(node, op_tok)
 
     def factor(self):
         tok = self.peek()
@@ -333,9 +432,7 @@ class Parser:
             op_tok = self.eat("OP")
             operand = self.factor()
             node = UnaryOp(op_tok.value, operand)
-            node.lineno = op_tok.lineno
-            node.filename = op_tok.filename
-            node.col = op_tok.col
+            self._locate(node, op_tok)
             return node
         return self.postfix()
 
@@ -355,17 +452,12 @@ class Parser:
                         args.append(self.expr())
                 rp = self.eat("RPAREN")
                 node = Call(node, args)
-                node.lineno = getattr(node, "lineno", rp.lineno)
-                node.filename = getattr(node, "filename", rp.filename)
-                node.col = getattr(node, "col", rp.col)
                 continue
             if nxt.type == "DOT":
                 self.eat("DOT")
                 mem = self.eat("IDENT")
                 node = ModuleAccess(node, mem.value)
-                node.lineno = mem.lineno
-                node.filename = mem.filename
-                node.col = mem.col
+                self._locate(node, mem)
                 continue
             if nxt.type == "LBRACK":
                 # index or slice
@@ -408,38 +500,32 @@ class Parser:
         if tok.type == "NUMBER":
             t = self.eat("NUMBER")
             node = Number(t.value)
-            node.lineno = t.lineno
-            node.filename = t.filename
-            node.col = t.col
+            self._locate(node, t)
             return node
         if tok.type == "STRING":
             t = self.eat("STRING")
             node = String(t.value)
-            node.lineno = t.lineno
-            node.filename = t.filename
-            node.col = t.col
+            self._locate(node, t)
             return node
         if tok.type == "TRUE":
             t = self.eat("TRUE")
             node = Boolean(True)
-            node.lineno = t.lineno
-            node.filename = t.filename
-            node.col = t.col
+            self._locate(node, t)
             return node
         if tok.type == "FALSE":
             t = self.eat("FALSE")
             node = Boolean(False)
-            node.lineno = t.lineno
-            node.filename = t.filename
-            node.col = t.col
+            self._locate(node, t)
             return node
         if tok.type == "IDENT":
             t = self.eat("IDENT")
             node = Var(t.value)
-            node.lineno = t.lineno
-            node.filename = t.filename
-            node.col = t.col
+            self._locate(node, t)
             return node
+        if tok.type in ("LBRACK", "LBRACE"):
+            node = self._constant_literal()
+            if node is not None:
+                return node
         if tok.type == "LBRACK":
             lb = self.eat("LBRACK")
             elems = []
@@ -450,9 +536,7 @@ class Parser:
                     elems.append(self.expr())
             self.eat("RBRACK")
             node = ListLiteral(elems)
-            node.lineno = lb.lineno
-            node.filename = lb.filename
-            node.col = lb.col
+            self._locate(node, lb)
             return node
         if tok.type == "LBRACE":
             lb = self.eat("LBRACE")
@@ -462,15 +546,11 @@ class Parser:
                     if self.peek().type == "STRING":
                         k_tok = self.eat("STRING")
                         key_node = String(k_tok.value)
-                        key_node.lineno = k_tok.lineno
-                        key_node.filename = k_tok.filename
-                        key_node.col = k_tok.col
+                        self._locate(key_node, k_tok)
                     elif self.peek().type == "IDENT":
                         k_tok = self.eat("IDENT")
                         key_node = String(k_tok.value)
-                        key_node.lineno = k_tok.lineno
-                        key_node.filename = k_tok.filename
-                        key_node.col = k_tok.col
+                        self._locate(key_node, k_tok)
                     else:
                         raise Exception(
                             f"Expected STRING or IDENT as dict key but got {self.peek().type} at {self.peek().filename}:{self.peek().lineno}:{self.peek().col}"
@@ -484,18 +564,490 @@ class Parser:
                     break
             self.eat("RBRACE")
             node = DictLiteral(pairs)
-            node.lineno = lb.lineno
-            node.filename = lb.filename
-            node.col = lb.col
+            self._locate(node, lb)
             return node
         if tok.type == "LPAREN":
             lp = self.eat("LPAREN")
             node = self.expr()
             self.eat("RPAREN")
-            node.lineno = getattr(node, "lineno", lp.lineno)
-            node.filename = getattr(node, "filename", lp.filename)
-            node.col = getattr(node, "col", lp.col)
             return node
         raise Exception(
             f"Unexpected token in expression: {tok.type} at {tok.filename}:{tok.lineno}:{tok.col}"
         )
+
+
+    # --- Explicit-stack mode ---
+    # generator twins of the recursive methods above: where those call a
+    # sub-parser, these yield its generator and receive the parsed node back,
+    # and _trampoline drives them from a list, so nesting depth costs heap
+    # memory instead of Python stack. Constructs that cannot nest reuse the
+    # plain methods. Keep the two in sync.
+    def _trampoline(self, gen):
+        stack = [gen]
+        value = None
+        while stack:
+            try:
+                sub = stack[-1].send(value)
+            except StopIteration as stop:
+                stack.pop()
+                value = stop.value
+            else:
+                stack.append(sub)
+                value = None
+        return value
+
+    def _g_block_statements(self):
+        stmts = []
+        while self.peek() and self.peek().type != "RBRACE":
+            self._skip_newlines()
+            if not self.peek() or self.peek().type == "RBRACE":
+                break
+            stmt = yield self._g_statement()
+            self._consume_terminator_or_validate()
+            stmts.append(stmt)
+        return stmts
+
+    def _g_statement(self):
+        tok = self.peek()
+        if not tok:
+            raise Exception("Unexpected end of input in statement")
+
+        if tok.type in ("FROM", "IMPORT"):
+            return self.statement()
+
+        if tok.type == "LET":
+            let_tok = self.eat("LET")
+            name_tok = self.eat("IDENT")
+            self.eat("ASSIGN")
+            expr = yield self._g_expr()
+            node = Assign(name_tok.value, expr, declare=True)
+            return node
+
+        if tok.type == "FUNC":
+            func_tok = self.eat("FUNC")
+            name = self.eat("IDENT").value
+            self.eat("LPAREN")
+            params = []
+            if self.peek() and self.peek().type == "IDENT":
+                params.append(self.eat("IDENT").value)
+                while self.peek() and self.peek().type == "COMMA":
+                    self.eat("COMMA")
+                    params.append(self.eat("IDENT").value)
+            self.eat("RPAREN")
+            self.eat("LBRACE")
+            body = yield self._g_block_statements()
+            self.eat("RBRACE")
+            node = FunctionDef(name, params, body)
+            node.set_pos(func_tok.lineno if self.optimize < 2 else None, func_tok.filename)
+            return node
+
+        if (
+            tok.type == "IDENT"
+            and self.peek_next()
+            and self.peek_next().type == "ASSIGN"
+        ):
+            name_tok = self.eat("IDENT")
+            self.eat("ASSIGN")
+            expr = yield self._g_expr()
+            node = Assign(name_tok.value, expr, declare=False)
+            return node
+
+        if tok.type == "PRINT":
+            p_tok = self.eat("PRINT")
+            if self.peek() and self.peek().type == "LPAREN":
+                self.eat("LPAREN")
+                expr = yield self._g_expr()
+                self.eat("RPAREN")
+            else:
+                expr = yield self._g_expr()
+            node = Print(expr)
+            return node
+
+        if tok.type == "RETURN":
+            r_tok = self.eat("RETURN")
+            expr = None
+            if self.peek() and self.peek().type not in (
+                "SEMICOLON",
+                "NEWLINE",
+                "RBRACE",
+            ):
+                expr = yield self._g_expr()
+            node = Return(expr)
+            if expr is None:
+                node.set_pos(None if self.optimize else r_tok.lineno, r_tok.filename)
+            return node
+
+        if tok.type == "IF":
+            return (yield self._g_if_statement())
+        if tok.type == "WHILE":
+            return (yield self._g_while_statement())
+
+        if tok.type in ("IDENT", "STRING", "NUMBER", "LPAREN", "LBRACK"):
+            expr = yield self._g_expr()
+            return expr
+
+        raise Exception(
+            f"Unknown statement start: {tok.type} at {tok.filename}:{tok.lineno}"
+        )
+
+    def _g_if_statement(self):
+        if_tok = self.eat("IF")
+        self.eat("LPAREN")
+        condition = yield self._g_expr()
+        self.eat("RPAREN")
+        self.eat("LBRACE")
+        then_branch = yield self._g_block_statements()
+        self.eat("RBRACE")
+
+        elif_branches = []
+        while self.peek() and self.peek().type == "ELIF":
+            self.eat("ELIF")
+            self.eat("LPAREN")
+            econd = yield self._g_expr()
+            self.eat("RPAREN")
+            self.eat("LBRACE")
+            ebranch = yield self._g_block_statements()
+            self.eat("RBRACE")
+            elif_branches.append((econd, ebranch))
+
+        else_branch = None
+        if self.peek() and self.peek().type == "ELSE":
+            self.eat("ELSE")
+            self.eat("LBRACE")
+            else_branch = yield self._g_block_statements()
+            self.eat("RBRACE")
+
+        node = If(condition, then_branch, elif_branches, else_branch)
+        return node
+
+    def _g_while_statement(self):
+        w_tok = self.eat("WHILE")
+        self.eat("LPAREN")
+        condition = yield self._g_expr()
+        self.eat("RPAREN")
+        self.eat("LBRACE")
+        body = yield self._g_block_statements()
+        self.eat("RBRACE")
+        node = While(condition, body)
+        return node
+
+    def _g_expr(self, min_prec=1):
+        tok = self.peek()
+        if tok and tok.type == "OP" and tok.value in UNARY_OPS:
+            node = yield self._g_factor()
+        else:
+            node = yield self._g_postfix()
+        while True:
+            tok = self.peek()
+            if not tok or tok.type != "OP":
+                return node
+            prec = BINARY_PRECEDENCE.get(tok.value)
+            if prec is None or prec < min_prec:
+                return node
+            op_tok = self.eat("OP")
+            right = yield self._g_expr(prec + 1)
+            node = BinOp(node, op_tok.value, right)
+            self._locate(node, op_tok)
+
+    def _g_factor(self):
+        tok = self.peek()
+        if tok and tok.type == "OP" and tok.value in ("!", "-"):
+            op_tok = self.eat("OP")
+            operand = yield self._g_factor()
+            node = UnaryOp(op_tok.value, operand)
+            self._locate(node, op_tok)
+            return node
+        return (yield self._g_postfix())
+
+    def _g_postfix(self):
+        node = yield self._g_primary()
+        while True:
+            nxt = self.peek()
+            if not nxt:
+                break
+            if nxt.type == "LPAREN":
+                self.eat("LPAREN")
+                args = []
+                if self.peek() and self.peek().type != "RPAREN":
+                    args.append((yield self._g_expr()))
+                    while self.peek() and self.peek().type == "COMMA":
+                        self.eat("COMMA")
+                        args.append((yield self._g_expr()))
+                rp = self.eat("RPAREN")
+                node = Call(node, args)
+                continue
+            if nxt.type == "DOT":
+                self.eat("DOT")
+                mem = self.eat("IDENT")
+                node = ModuleAccess(node, mem.value)
+                self._locate(node, mem)
+                continue
+            if nxt.type == "LBRACK":
+                self.eat("LBRACK")
+                if self.peek() and self.peek().type != "RBRACK":
+                    start_expr = None
+                    if self.peek() and self.peek().type != "COLON":
+                        start_expr = yield self._g_expr()
+                    if self.peek() and self.peek().type == "COLON":
+                        self.eat("COLON")
+                        stop_expr = None
+                        if self.peek() and self.peek().type != "RBRACK":
+                            stop_expr = yield self._g_expr()
+                        slice_node = Slice(start_expr, stop_expr)
+                        self.eat("RBRACK")
+                        node = Index(node, slice_node)
+                        continue
+                    else:
+                        idx = start_expr
+                        self.eat("RBRACK")
+                        node = Index(node, idx)
+                        continue
+                else:
+                    self.eat("RBRACK")
+                    raise Exception(
+                        f"Empty index [] not allowed at {nxt.filename}:{nxt.lineno}:{nxt.col}"
+                    )
+            break
+        return node
+
+    def _g_primary(self):
+        tok = self.peek()
+        if not tok or tok.type not in ("LBRACK", "LBRACE", "LPAREN"):
+            return self.primary()
+        if tok.type in ("LBRACK", "LBRACE"):
+            node = self._constant_literal()
+            if node is not None:
+                return node
+        if tok.type == "LBRACK":
+            lb = self.eat("LBRACK")
+            elems = []
+            if self.peek() and self.peek().type != "RBRACK":
+                elems.append((yield self._g_expr()))
+                while self.peek() and self.peek().type == "COMMA":
+                    self.eat("COMMA")
+                    elems.append((yield self._g_expr()))
+            self.eat("RBRACK")
+            node = ListLiteral(elems)
+            self._locate(node, lb)
+            return node
+        if tok.type == "LBRACE":
+            lb = self.eat("LBRACE")
+            pairs = []
+            if self.peek() and self.peek().type != "RBRACE":
+                while True:
+                    if self.peek().type in ("STRING", "IDENT"):
+                        k_tok = self.eat()
+                        key_node = String(k_tok.value)
+                        self._locate(key_node, k_tok)
+                    else:
+                        raise Exception(
+                            f"Expected STRING or IDENT as dict key but got {self.peek().type} at {self.peek().filename}:{self.peek().lineno}:{self.peek().col}"
+                        )
+                    self.eat("COLON")
+                    val = yield self._g_expr()
+                    pairs.append((key_node, val))
+                    if self.peek() and self.peek().type == "COMMA":
+                        self.eat("COMMA")
+                        continue
+                    break
+            self.eat("RBRACE")
+            node = DictLiteral(pairs)
+            self._locate(node, lb)
+            return node
+        lp = self.eat("LPAREN")
+        node = yield self._g_expr()
+        self.eat("RPAREN")
+        return node
+
+class StreamParser(Parser):
+    """
+    Parser that pulls tokens from an iterator (e.g. lexer.tokenize_file)
+    in small batches through a lookahead buffer instead of indexing a full
+    list.
+    """
+
+    def __init__(self, tokens, deep=False, optimize=0):
+        self.tokens = iter(tokens)
+        self.ahead = deque()
+        self.pos = 0
+        self.deep = deep
+        self.optimize = optimize
+        self._not_constant = set()
+        # tokens eaten since _mark(), so a statement can be re-parsed after a
+        # RecursionError; None while nothing will be re-parsed (explicit stack)
+        self.history = None
+
+    def _fill(self, n):
+        while len(self.ahead) < n:
+            # a RecursionError raised inside the token generator would finish
+            # it for good: hit the limit here instead, where the statement can
+            # still be rewound and parsed again
+            _headroom(32)
+            batch = list(islice(self.tokens, 512))
+            if not batch:
+                return False
+            self.ahead.extend(batch)
+        return True
+
+    def peek(self):
+        return self.ahead[0] if self._fill(1) else None
+
+    def peek_next(self):
+        return self.ahead[1] if self._fill(2) else None
+
+    def _peek_at(self, k):
+        return self.ahead[k] if self._fill(k + 1) else None
+
+    def _advance(self, k):
+        if self.history is None:
+            for _ in range(k):
+                self.ahead.popleft()
+        else:
+            for _ in range(k):
+                self.history.append(self.ahead.popleft())
+            if len(self.history) > REPARSE_BUFFER:
+                raise _ParseAgain()
+        self.pos += k
+
+    def eat(self, expected_type=None):
+        tok = self.peek()
+        if not tok:
+            raise Exception("Unexpected end of input")
+        if expected_type and tok.type != expected_type:
+            raise Exception(
+                f"Expected {expected_type} but got {tok.type} at {tok.filename}:{tok.lineno}:{tok.col}"
+            )
+        self.ahead.popleft()
+        if self.history is not None:
+            self.history.append(tok)
+            if len(self.history) > REPARSE_BUFFER:
+                raise _ParseAgain()
+        self.pos += 1
+        return tok
+
+    def _mark(self):
+        # the explicit-stack methods never give up on a statement
+        self.history = None if self.deep else []
+        return self.pos
+
+    def _rewind(self, mark):
+        # the statement is parsed again with the explicit stack: stop recording
+        self.ahead.extendleft(reversed(self.history))
+        self.history = None
+        self.pos = mark
+
+
+class IncrementalParser:
+    """
+    Parser for input that arrives in pieces, e.g. REPL lines: feed() takes
+    the next tokens and returns the statements they complete. Tokens are
+    only parsed at a NEWLINE outside a { } block (the one place a newline
+    can't end a statement), so a statement is parsed once, however many
+    lines it spans. is_complete() is False while a block is still open.
+    """
+
+    def __init__(self, optimize=0):
+        self.optimize = optimize
+        self.pending = []  # tokens not parsed yet
+        self.open = []  # unclosed brackets in pending: True for a block brace
+
+    def is_complete(self):
+        return not self.pending
+
+    def feed(self, tokens):
+        stmts = []
+        pending = self.pending
+        for tok in tokens:
+            t = tok.type
+            if t == "LPAREN" or t == "LBRACK" or t == "LBRACE":
+                # a block brace follows the ")" of if / elif / while / func, or else
+                prev = pending[-1].type if pending else None
+                self.open.append(t == "LBRACE" and prev in ("RPAREN", "ELSE"))
+            elif t == "RPAREN" or t == "RBRACK" or t == "RBRACE":
+                if self.open:
+                    self.open.pop()
+            pending.append(tok)
+            if t == "NEWLINE" and not (self.open and self.open[-1]):
+                # complete, or a syntax error: a newline inside ( ) or [ ] never parses
+                self.pending, self.open = [], []
+                stmts.extend(Parser(pending, optimize=self.optimize).parse())
+                pending = self.pending
+        return stmts
+
+
+def _parse_piece(chunk, filename, lineno, optimize):
+    # lex and parse whole top-level statements starting at line lineno;
+    # errors come back tagged as ("lex" | "parse", message)
+    lexer = Lexer(filename)
+    lexer.lineno = lineno
+    lexer._buf = chunk
+    try:
+        tokens = list(lexer._scan(final=True))
+    except Exception as e:
+        return "lex", str(e)
+    try:
+        return "ok", Parser(tokens, optimize=optimize).parse()
+    except Exception as e:
+        return "parse", str(e)
+
+
+def _parse_chunk(chunk, filename, lineno, optimize):
+    # runs in a worker process: only the finished trees are sent back
+    kind, result = _parse_piece(chunk, filename, lineno, optimize)
+    if kind == "ok":
+        out = io.BytesIO()
+        pickler = pickle.Pickler(out, protocol=pickle.HIGHEST_PROTOCOL)
+        # no memo: the trees have no cycles, and they load faster without it
+        pickler.fast = True
+        try:
+            pickler.dump(result)
+        except RecursionError:
+            # nested too deeply to pickle: the parent parses the piece itself
+            return "deep", None
+        result = out.getvalue()
+    return kind, result
+
+
+def parse_parallel(
+    code, filename="<input>", source_map=None, keep_source=True, workers=None, optimize=0
+):
+    """
+    Same statements as Parser(tokenize(code, filename)).parse(), but a large
+    source is split between top-level statements (lexer.split_points) and
+    the pieces are lexed and parsed on a process pool. Workers send back
+    parsed statements, so the parent never handles individual tokens.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    if source_map is None:
+        source_map = SOURCE_MAP
+    if keep_source:
+        remember_source(source_map, filename, code)
+    filename = sys.intern(filename)
+    workers = workers or os.cpu_count() or 1
+    points = split_points(code, workers) if len(code) >= PARALLEL_MIN_SIZE else []
+    bounds = [0] + points + [len(code)]
+    pieces = []
+    lineno = 1
+    for start, end in zip(bounds, bounds[1:]):
+        pieces.append((code[start:end], filename, lineno, optimize))
+        lineno += code.count("\n", start, end)
+    if len(pieces) == 1:
+        results = [_parse_piece(*pieces[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_parse_chunk, *zip(*pieces)))
+    # a single parse lexes the whole file first: a lexer error anywhere is
+    # reported before any parse error, and the earliest of each kind wins
+    for wanted in ("lex", "parse"):
+        for kind, result in results:
+            if kind == wanted:
+                raise Exception(result)
+    stmts = []
+    for piece, (kind, result) in zip(pieces, results):
+        if kind == "deep":
+            result = _parse_piece(*piece)[1]
+        elif len(pieces) > 1:
+            result = pickle.loads(result)
+        stmts.extend(result)
+    return stmts
@@ -1,18 +1,110 @@
 # repl.py - DLBA REPL with readline/history and stdlib registration (v0.8)
+#
+# meta-commands (run in the REPL's environment):
+#   :time <stmt>        wall and CPU time of lexing, parsing and running stmt
+#   :bench <stmt> [n]   run stmt n times (default 1000) after a warmup and
+#                       report mean, stddev and percentiles
 import os
+import statistics
+import time
 
 try:
     import readline
 except Exception:
     readline = None
 
-from parser import Parser
+from parser import IncrementalParser, Parser
 
 from env import Environment
 from interpreter import format_traceback, interpret, register_stdlib
-from lexer import tokenize
+from lexer import SOURCE_MAP, Lexer, remember_source, tokenize
 
 HISTORY_FILE = os.path.expanduser("~/.dlba_history")
+BENCH_RUNS = 1000
+
+
+def _fmt(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.3f} ms"
+    return f"{seconds:.3f} s"
+
+
+def _parse(code):
+    return Parser(tokenize(code, filename="<stdin>")).parse()
+
+
+def _time(code, env):
+    phases = []
+    wall, cpu = time.perf_counter(), time.process_time()
+
+    def lap(name):
+        nonlocal wall, cpu
+        now_wall, now_cpu = time.perf_counter(), time.process_time()
+        phases.append((name, now_wall - wall, now_cpu - cpu))
+        wall, cpu = now_wall, now_cpu
+
+    toks = tokenize(code, filename="<stdin>")
+    lap("lex")
+    stmts = Parser(toks).parse()
+    lap("parse")
+    try:
+        interpret(stmts, env, current_filename="<stdin>")
+    finally:
+        lap("execute")
+        for name, w, c in phases:
+            print(f"  {name:<8} wall {_fmt(w):>12}  cpu {_fmt(c):>12}")
+        total_w = sum(p[1] for p in phases)
+        total_c = sum(p[2] for p in phases)
+        print(f"  {'total':<8} wall {_fmt(total_w):>12}  cpu {_fmt(total_c):>12}")
+
+
+def _bench(arg, env):
+    # a trailing integer is the run count if the rest is a statement on its own
+    code, runs = arg, BENCH_RUNS
+    head, _, last = arg.rpartition(" ")
+    stmts = None
+    if head.strip() and last.isdigit():
+        try:
+            stmts, runs = _parse(head), int(last)
+            code = head
+        except Exception:
+            stmts = None
+    if stmts is None:
+        stmts = _parse(code)
+    if runs < 1:
+        raise Exception("run count must be at least 1")
+    for _ in range(max(1, runs // 10)):
+        interpret(stmts, env, current_filename="<stdin>")
+    times = []
+    clock = time.perf_counter
+    for _ in range(runs):
+        start = clock()
+        interpret(stmts, env, current_filename="<stdin>")
+        times.append(clock() - start)
+    times.sort()
+
+    def pct(p):
+        return times[min(len(times) - 1, int(p / 100 * len(times)))]
+
+    stdev = statistics.stdev(times) if runs > 1 else 0.0
+    print(f"  {runs} runs: mean {_fmt(statistics.fmean(times))}, stddev {_fmt(stdev)}")
+    print(
+        f"  min {_fmt(times[0])}, p50 {_fmt(pct(50))}, p90 {_fmt(pct(90))},"
+        f" p99 {_fmt(pct(99))}, max {_fmt(times[-1])}"
+    )
+
+
+def _meta_command(line, env):
+    cmd, _, arg = line.strip().partition(" ")
+    arg = arg.strip()
+    if cmd == ":time" and arg:
+        _time(arg, env)
+    elif cmd == ":bench" and arg:
+        _bench(arg, env)
+    else:
+        print("Commands: :time <stmt>, :bench <stmt> [n]")
 
 
 def repl():
@@ -23,23 +115,39 @@ def repl():
             readline.read_history_file(HISTORY_FILE)
         except FileNotFoundError:
             pass
-    buffer = ""
+    # each line is lexed once and fed on; a statement is parsed once it is
+    # complete (positions are relative to the statement's first line)
+    lexer = Lexer("<stdin>")
+    parser = IncrementalParser()
+    lines = []
     print("DLBA REPL (v0.8). Type 'exit' to quit.")
     while True:
         try:
-            prompt = "DLBA> " if buffer == "" else "...> "
+            prompt = "DLBA> " if not lines else "...> "
             line = input(prompt)
             if line.strip() in ("exit", "quit"):
                 break
-            buffer += line + "\n"
-            try:
-                toks = tokenize(buffer, filename="<stdin>")
-                parser = Parser(toks)
-                stmts = parser.parse()
-            except Exception as e:
-                if "Unexpected end of input" in str(e):
+            if not lines and line.lstrip().startswith(":"):
+                try:
+                    _meta_command(line, env)
+                except Exception as e:
+                    format_traceback(e)
+                continue
+            lines.append(line)
+            stmts = parser.feed(lexer.feed(line + "\n"))
+            rest = lexer.flush()
+            if rest is None:
+                held = lexer.pending()
+                if held.startswith("/*") or held.startswith('"\n'):
+                    # inside a block comment, or a string opened at the end of a line
                     continue
-                raise
+                # a quote left open mid-line: fail as a whole file would
+                lexer.finish()
+            stmts += parser.feed(rest)
+            if not parser.is_complete():
+                continue
+            remember_source(SOURCE_MAP, "<stdin>", "\n".join(lines) + "\n")
+            lexer, lines = Lexer("<stdin>"), []
             try:
                 interpret(stmts, env, current_filename="<stdin>")
             except Exception as ei:
@@ -49,7 +157,6 @@ def repl():
                     readline.write_history_file(HISTORY_FILE)
                 except Exception:
                     pass
-            buffer = ""
         except Exception as e:
             print("Parse error:", e)
-            buffer = ""
+            lexer, parser, lines = Lexer("<stdin>"), IncrementalParser(), []
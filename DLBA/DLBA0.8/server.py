@@ -0,0 +1,107 @@
+# server.py - persistent DLBA server (v0.8)
+#
+# `python main.py --serve [--socket PATH]` keeps one warm interpreter process
+# listening on a Unix socket. Each request is one JSON line
+#   {"script": path, "argv": [...], "cwd": dir}
+# answered by JSON lines {"out": text} / {"err": text} and a final
+# {"exit": status}. Scripts run one at a time, each in a fresh top-level
+# Environment; the module cache, parsed-AST cache and builtins stay warm.
+# Cached modules are not re-run: their globals (a module-level list, say)
+# are shared by every script that imports them until the module file
+# changes. Their `dlba` is rebound to the current script's on every run.
+import json
+import os
+import socket
+from contextlib import redirect_stderr, redirect_stdout
+
+import interpreter
+from client import DEFAULT_SOCKET
+
+
+class _StreamForwarder:
+    # file-like object that forwards writes to the client as JSON lines
+    def __init__(self, conn, stream):
+        self.conn = conn
+        self.stream = stream
+
+    def write(self, text):
+        if text:
+            msg = json.dumps({self.stream: text}) + "\n"
+            self.conn.sendall(msg.encode("utf-8"))
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def _check_request(request):
+    if not isinstance(request, dict):
+        raise ValueError("request must be a JSON object")
+    if not isinstance(request.get("script"), str):
+        raise ValueError('"script" must be a string')
+    argv = request.get("argv", [])
+    if not isinstance(argv, list) or not all(isinstance(a, str) for a in argv):
+        raise ValueError('"argv" must be a list of strings')
+    if not isinstance(request.get("cwd") or "", str):
+        raise ValueError('"cwd" must be a string')
+
+
+def _send(conn, msg):
+    conn.sendall((json.dumps(msg) + "\n").encode("utf-8"))
+
+
+def _handle(conn, run_file):
+    with conn, conn.makefile("r", encoding="utf-8") as rfile:
+        line = rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+            _check_request(request)
+        except ValueError as e:
+            _send(conn, {"err": f"Bad request: {e}\n"})
+            _send(conn, {"exit": 2})
+            return
+        out = _StreamForwarder(conn, "out")
+        err = _StreamForwarder(conn, "err")
+        cwd = os.getcwd()
+        try:
+            os.chdir(request.get("cwd") or cwd)
+            # reload modules edited since the previous script
+            interpreter.drop_stale_modules()
+            with redirect_stdout(out), redirect_stderr(err):
+                status = run_file(request["script"], request.get("argv", []))
+        except (BrokenPipeError, ConnectionResetError):
+            raise
+        except Exception as e:
+            # e.g. a cwd that does not exist: fail this request, keep serving
+            _send(conn, {"err": f"DLBA server: {e}\n"})
+            status = 1
+        finally:
+            os.chdir(cwd)
+        _send(conn, {"exit": status})
+
+
+def serve(run_file, sock_path=DEFAULT_SOCKET):
+    if os.path.exists(sock_path):
+        os.unlink(sock_path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(sock_path)
+    sock.listen()
+    print(f"DLBA server listening on {sock_path}")
+    try:
+        while True:
+            conn, _ = sock.accept()
+            try:
+                _handle(conn, run_file)
+            except (BrokenPipeError, ConnectionResetError):
+                # client went away mid-script; keep serving
+                pass
+            except Exception as e:
+                print(f"Request failed: {e}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.close()
+        if os.path.exists(sock_path):
+            os.unlink(sock_path)
@@ -0,0 +1,99 @@
+# snapshot.py - frozen pre-initialized runtime images (v0.8)
+import argparse
+import io
+import os
+import pickle
+
+import interpreter
+from ast_nodes import Import
+from env import Environment
+from interpreter import BUILTINS, FileValue, NativeFunction, register_stdlib
+
+# a snapshot image starts with this header, followed by a pickled dict:
+#   {"env": top-level Environment, "modules": {abs_path: module_env},
+#    "mtimes": {abs_path: st_mtime_ns}}
+# the shared builtins are stored by reference, never by value
+SNAPSHOT_MAGIC = b"DLBASNP1"
+
+
+class _SnapshotPickler(pickle.Pickler):
+    def persistent_id(self, obj):
+        if obj is BUILTINS:
+            return ("builtins",)
+        if isinstance(obj, NativeFunction):
+            if BUILTINS.vars.get(obj.name) is obj:
+                return ("native", obj.name)
+            raise Exception(f"Cannot snapshot native function '{obj.name}'")
+        if isinstance(obj, FileValue):
+            raise Exception("Cannot snapshot an open file")
+        return None
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    def persistent_load(self, pid):
+        if pid[0] == "builtins":
+            return BUILTINS
+        if pid[0] == "native":
+            return BUILTINS.vars[pid[1]]
+        raise pickle.UnpicklingError(f"Unknown snapshot reference {pid!r}")
+
+
+def build_snapshot(out_path, preload=(), interp=None):
+    """
+    Run register_stdlib and load every module in preload into the module
+    cache, then write the resulting runtime image to out_path.
+    """
+    interp = interp or interpreter.default_interpreter()
+    env = Environment()
+    register_stdlib(env)
+    for path in preload:
+        node = Import(path)
+        node.filename = "<input>"  # resolve relative to the cwd
+        node.lineno = 0
+        # load through the regular import machinery, but bind nothing
+        interp._handle_import(node, Environment(parent=env))
+    modules = dict(interp.loaded_modules)
+    image = {
+        "env": env,
+        "modules": modules,
+        "mtimes": {p: os.stat(p).st_mtime_ns for p in modules if os.path.exists(p)},
+    }
+    buf = io.BytesIO()
+    _SnapshotPickler(buf, protocol=pickle.HIGHEST_PROTOCOL).dump(image)
+    with open(out_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(buf.getvalue())
+    return image
+
+
+def load_snapshot(path, interp=None):
+    """
+    Restore an image written by build_snapshot: the module cache of interp
+    (default: the default Interpreter) is filled in place and the
+    pre-initialized top-level Environment is returned.
+    """
+    interp = interp or interpreter.default_interpreter()
+    with open(path, "rb") as f:
+        if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+            raise Exception(f"{path} is not a DLBA snapshot image")
+        image = _SnapshotUnpickler(f).load()
+    for mod_path, mtime in image["mtimes"].items():
+        if not os.path.exists(mod_path) or os.stat(mod_path).st_mtime_ns != mtime:
+            raise Exception(
+                f"Snapshot {path} is stale: {mod_path} changed since it was built"
+            )
+    interp.loaded_modules.update(image["modules"])
+    interp.module_mtimes.update(image["mtimes"])
+    return image["env"]
+
+
+def main(argv):
+    ap = argparse.ArgumentParser(
+        prog="main.py snapshot",
+        description="Build a pre-initialized runtime image for --snapshot.",
+    )
+    ap.add_argument("-o", "--output", required=True, help="image path")
+    ap.add_argument("preload", nargs="*", help="modules to load into the image")
+    args = ap.parse_args(argv)
+    image = build_snapshot(args.output, args.preload)
+    print(f"snapshot with {len(image['modules'])} module(s) -> {args.output}")
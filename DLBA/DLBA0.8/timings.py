@@ -0,0 +1,97 @@
+# timings.py - per-phase time and allocation report for --timings (v0.8)
+#
+#   python main.py --timings script.dlba
+#
+# the report goes to stderr: wall time and net allocated memory blocks
+# (sys.getallocatedblocks) of each phase of the run, then one line per
+# import statement in execution order, indented by nesting like
+# python -X importtime.
+import sys
+import time
+from contextlib import contextmanager
+
+
+class _Record:
+    def __init__(self, name):
+        self.name = name
+        self.phases = []  # (phase, seconds, blocks)
+        self.children = []  # imports run while this one executed
+        self.total = 0.0
+
+    def seconds(self, *names):
+        return sum(s for n, s, _ in self.phases if n in names)
+
+    def has(self, name):
+        return any(n == name for n, _, _ in self.phases)
+
+
+class Timings:
+    def __init__(self):
+        self.root = _Record("<program>")
+        self._stack = [self.root]
+
+    @contextmanager
+    def phase(self, name):
+        record = self._stack[-1]
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            record.phases.append((name, elapsed, sys.getallocatedblocks() - blocks))
+
+    @contextmanager
+    def module(self, name):
+        # one import statement; phases recorded meanwhile belong to it
+        record = _Record(name)
+        self._stack[-1].children.append(record)
+        self._stack.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.total = time.perf_counter() - start
+            self._stack.pop()
+
+    def report(self, out=None):
+        out = out or sys.stderr
+        print("[timings] phase               wall   alloc blocks", file=out)
+        for name, seconds, blocks in self.root.phases:
+            print(f"[timings] {name:<16} {_ms(seconds):>9} {blocks:>+14}", file=out)
+        total = sum(s for _, s, _ in self.root.phases)
+        print(f"[timings] {'total':<16} {_ms(total):>9}", file=out)
+        if self.root.children:
+            print(
+                "[timings] import:   resolve |     parse |  exec self | cumulative | module",
+                file=out,
+            )
+            for record, depth in _walk(self.root.children):
+                self._report_import(record, depth, out)
+
+    def _report_import(self, record, depth, out):
+        resolve = record.seconds("resolve")
+        name = "  " * depth + record.name
+        if not record.has("execute"):
+            # already loaded (or failed before running): only resolved
+            parse = execute = "-"
+            name += " (cached)"
+        else:
+            parse = _ms(record.seconds("read", "tokenize", "parse", "tokenize+parse", "disk cache"))
+            nested = sum(child.total for child in record.children)
+            execute = _ms(record.seconds("execute") - nested)
+        print(
+            f"[timings] import: {_ms(resolve):>9} | {parse:>9} | {execute:>10} |"
+            f" {_ms(record.total):>10} | {name}",
+            file=out,
+        )
+
+
+def _walk(records, depth=0):
+    for record in records:
+        yield record, depth
+        yield from _walk(record.children, depth + 1)
+
+
+def _ms(seconds):
+    return f"{seconds * 1e3:.3f}ms"
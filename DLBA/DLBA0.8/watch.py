@@ -0,0 +1,69 @@
+# watch.py - re-run a script whenever it or a module it imports changes (v0.8)
+#
+#   python main.py --watch script.dlba [args...]
+#
+# files are polled (stdlib only, works everywhere). On a change only the
+# edited modules and the modules that import them are reloaded; everything
+# else stays loaded, and unchanged files are never re-lexed or re-parsed.
+import os
+import sys
+import time
+
+from interpreter import default_interpreter
+
+POLL_INTERVAL = 0.3
+
+
+def _watched_files(interp, entry):
+    # entry plus everything reachable through the recorded import graph
+    files = set()
+    todo = [entry]
+    while todo:
+        path = todo.pop()
+        if path in files:
+            continue
+        files.add(path)
+        todo.extend(interp.module_deps.get(path, ()))
+    return files
+
+
+def _mtimes(files):
+    mtimes = {}
+    for path in files:
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            mtimes[path] = None
+    return mtimes
+
+
+def watch(run_file, script, argv=None, interval=POLL_INTERVAL):
+    interp = default_interpreter()
+    entry = os.path.abspath(script)
+    try:
+        while True:
+            # the entry's import edges are recorded afresh on every run
+            interp.module_deps.pop(entry, None)
+            start = time.perf_counter()
+            status = run_file(script, argv or [])
+            elapsed = time.perf_counter() - start
+            sys.stdout.flush()
+            print(
+                f"[watch] exit {status} in {elapsed:.3f}s; waiting for changes...",
+                file=sys.stderr,
+            )
+            seen = _mtimes(_watched_files(interp, entry))
+            while True:
+                time.sleep(interval)
+                now = _mtimes(seen)
+                changed = [p for p in seen if now[p] != seen[p]]
+                if changed:
+                    break
+            reloaded = interp.invalidate_modules(changed) - {entry}
+            names = ", ".join(sorted(os.path.relpath(p) for p in changed))
+            print(
+                f"[watch] changed: {names}; reloading {len(reloaded)} module(s)",
+                file=sys.stderr,
+            )
+    except KeyboardInterrupt:
+        return 0